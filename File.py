@@ -1,10 +1,15 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
-import time
 import threading
 import random
-import math
 import os
+import math
+
+from timekeeping import TkClock, Countdown, timer_color
+from audio_stream import ProbeCache, WavStream, can_stream
+from schedules import AlarmScheduler, parse_schedule
+from animation import (BASE_WIDTH, BASE_HEIGHT, PARALLAX_LAYERS, PRIORITY_ESSENTIAL,
+                       StarField, StarView, FrameClock, EffectScheduler, ShedLog)
 
 # Try to import pygame for MP3 playback
 try:
@@ -15,6 +20,9 @@ except:
     PYGAME_AVAILABLE = False
 
 # ========================= GLOBAL VARIABLES =========================
+clock = None  # TkClock, created together with the root window
+countdown = None
+alarm_schedules = AlarmScheduler()  # Recurring alarms typed into the time field
 timer_thread = None
 stop_event = threading.Event()
 timer_running = False
@@ -28,12 +36,19 @@ target_progress = 0.0
 
 # Custom alarm sound
 custom_alarm_file = None
+sound_probes = ProbeCache()  # Metadata of checked sound files
 
 # Theme colors
 current_bg_color = [224, 242, 254]  # #e0f2fe (day theme)
 target_bg_color = [224, 242, 254]
 transition_speed = 2
 
+# Window size (resizable, base layout is 420x820 at 96 DPI)
+ui_scale = 1.0
+canvas_width = BASE_WIDTH
+canvas_height = BASE_HEIGHT
+relayout_job = None
+
 # Sound settings (for Windows)
 try:
     import winsound
@@ -84,90 +99,6 @@ class Particle:
                           self.x + self.size, self.y + self.size)
         return True
 
-# ========================= STAR SYSTEM =========================
-class Star:
-    """Enhanced star with twinkling effect"""
-    def __init__(self, canvas, width, height):
-        self.canvas = canvas
-        self.width = width
-        self.height = height
-        self.x = random.randint(0, width)
-        self.y = random.randint(0, height)
-        self.size = random.randint(2, 7)
-        self.speed = random.uniform(0.15, 0.6)
-        self.direction = random.uniform(-0.25, 0.25)
-        self.is_night = False
-        
-        # Twinkling effect
-        self.twinkle_speed = random.uniform(0.02, 0.08)
-        self.twinkle_phase = random.uniform(0, math.pi * 2)
-        self.base_opacity = random.uniform(0.6, 1.0)
-        
-        # Day colors (blue tones)
-        self.day_colors = ["#bae6fd", "#7dd3fc", "#38bdf8", "#0ea5e9", "#ffffff", "#93c5fd"]
-        # Night colors (yellow/gold tones)
-        self.night_colors = ["#fef08a", "#fde047", "#facc15", "#eab308", "#ffffff", "#fbbf24", "#fcd34d"]
-        
-        self.base_color = random.choice(self.day_colors)
-        self.current_color = self.base_color
-        
-        # Create star with glow effect
-        self.glow = canvas.create_oval(
-            self.x - 2, self.y - 2,
-            self.x + self.size + 2, self.y + self.size + 2,
-            fill="", outline=self.current_color, width=0
-        )
-        
-        self.star = canvas.create_oval(
-            self.x, self.y,
-            self.x + self.size, self.y + self.size,
-            fill=self.current_color, outline=""
-        )
-    
-    def change_theme(self, is_night):
-        """Change star color based on theme"""
-        if is_night != self.is_night:
-            self.is_night = is_night
-            if is_night:
-                self.base_color = random.choice(self.night_colors)
-            else:
-                self.base_color = random.choice(self.day_colors)
-    
-    def update(self):
-        """Update star position and twinkling effect"""
-        # Movement
-        self.y += self.speed
-        self.x += self.direction
-        
-        # Twinkling effect
-        self.twinkle_phase += self.twinkle_speed
-        twinkle_factor = (math.sin(self.twinkle_phase) + 1) / 2  # 0 to 1
-        opacity = self.base_opacity * (0.3 + 0.7 * twinkle_factor)
-        
-        # Reset position if out of bounds
-        if self.y > self.height + 20:
-            self.y = random.randint(-50, -10)
-            self.x = random.randint(0, self.width)
-            self.direction = random.uniform(-0.25, 0.25)
-            if self.is_night:
-                self.base_color = random.choice(self.night_colors)
-            else:
-                self.base_color = random.choice(self.day_colors)
-        
-        if self.x < -10:
-            self.x = self.width + 10
-        elif self.x > self.width + 10:
-            self.x = -10
-        
-        # Update position
-        self.canvas.coords(self.star, self.x, self.y,
-                          self.x + self.size, self.y + self.size)
-        self.canvas.coords(self.glow, self.x - 2, self.y - 2,
-                          self.x + self.size + 2, self.y + self.size + 2)
-        
-        # Update color with opacity (simplified)
-        self.canvas.itemconfig(self.star, fill=self.base_color)
-
 # ========================= SHOOTING STAR =========================
 class ShootingStar:
     """Rare shooting star effect"""
@@ -224,10 +155,16 @@ def play_alarm():
         if custom_alarm_file and PYGAME_AVAILABLE:
             def play_custom():
                 try:
+                    info = sound_probes.probe(custom_alarm_file)
+                    if can_stream(info):
+                        # Stream WAV in small chunks instead of loading it all
+                        WavStream(info, clock).play(loops=2, keep_playing=lambda: alarm_playing)
+                        return
+                    
                     mixer.music.load(custom_alarm_file)
                     mixer.music.play(loops=2)  # Play 3 times
                     while mixer.music.get_busy() and alarm_playing:
-                        time.sleep(0.1)
+                        clock.sleep(0.1)
                 except Exception as e:
                     print(f"Error playing custom sound: {e}")
                     messagebox.showerror("Error", "Could not play custom sound file!")
@@ -251,7 +188,7 @@ def play_alarm():
                 # Vary frequency for more interesting sound
                 varied_freq = freq + (i % 3) * 100
                 winsound.Beep(varied_freq, duration)
-                time.sleep(0.2)
+                clock.sleep(0.2)
             except:
                 pass
     
@@ -265,13 +202,12 @@ def stop_alarm():
     if PYGAME_AVAILABLE:
         try:
             mixer.music.stop()
+            mixer.stop()  # Streamed sounds play on mixer channels
         except:
             pass
 
 def select_custom_sound():
     """Open file dialog to select custom MP3 alarm"""
-    global custom_alarm_file
-    
     file_path = filedialog.askopenfilename(
         title="Select Alarm Sound",
         filetypes=[
@@ -282,20 +218,58 @@ def select_custom_sound():
         ]
     )
     
-    if file_path:
+    if not file_path:
+        return
+    
+    filename = os.path.basename(file_path)
+    short_name = f"{filename[:30]}..." if len(filename) > 30 else filename
+    # The label goes back to this if the new file can't be used
+    previous_label = custom_sound_label.cget("text"), custom_sound_label.cget("fg")
+    custom_sound_label.config(text=f"⏳ Checking {short_name}", fg="#94a3b8")
+    
+    def on_probed(info, error):
+        global custom_alarm_file
+        if error:
+            # Keep the previously selected sound, and say so
+            text, fg = previous_label
+            custom_sound_label.config(text=text, fg=fg)
+            kept = f"\n\nStill using {os.path.basename(custom_alarm_file)}" if custom_alarm_file else ""
+            messagebox.showerror("Error", f"Could not use this sound file:\n{error}{kept}")
+            return
+        
         custom_alarm_file = file_path
-        filename = os.path.basename(file_path)
-        custom_sound_label.config(
-            text=f"📁 {filename[:30]}..." if len(filename) > 30 else f"📁 {filename}",
-            fg="#10b981"
-        )
+        length = f" ({int(info.duration // 60)}:{int(info.duration % 60):02d})" if info.duration else ""
+        custom_sound_label.config(text=f"📁 {short_name}{length}", fg="#10b981")
         alarm_sound_var.set("🎧 Custom Sound")
         messagebox.showinfo("Success", f"Custom alarm sound loaded:\n{filename}")
+    
+    # Check the file in the background, then update the UI on the Tk thread
+    sound_probes.probe_async(file_path, lambda info, error: clock.after(0, on_probed, info, error))
 
 # ========================= TIMER FUNCTIONS =========================
+def alarm_time(text):
+    """(seconds to count down, fixed fire time or None) for a number of minutes or a schedule like 'weekdays 16:30'"""
+    alarm_schedules.clear()
+    try:
+        return int(float(text) * 60), None
+    except ValueError:
+        pass
+    
+    alarm_schedules.add(parse_schedule(text))
+    now = clock.time()
+    fire_time, schedule = alarm_schedules.next_fire(now)
+    return math.ceil(fire_time - now), fire_time
+
+def show_remaining(seconds):
+    """Show the seconds left on the timer label"""
+    mins, secs = divmod(seconds, 60)
+    
+    # Color coding based on time remaining
+    label_timer.config(text=f"{mins:02d}:{secs:02d}", fg=timer_color(seconds))
+
 def start_countdown():
     """Start the countdown timer"""
-    global timer_thread, timer_running, remaining_seconds, is_paused, target_progress
+    global timer_thread, timer_running, remaining_seconds, is_paused, target_progress, countdown
     
     if timer_running and not is_paused:
         return
@@ -303,13 +277,13 @@ def start_countdown():
     if is_paused:
         # Resume from pause
         is_paused = False
+        countdown.resume()
         start_button.config(text="⏸️ Pause Timer")
         pause_button.config(state="normal")
         return
     
     try:
-        minutes = float(entry_time.get())
-        remaining_seconds = int(minutes * 60)
+        remaining_seconds, fire_time = alarm_time(entry_time.get())
         name = entry_name.get().strip()
         
         if not name:
@@ -337,34 +311,26 @@ def start_countdown():
         # Change to night theme
         change_to_night_theme()
         
+        def on_tick(seconds):
+            global remaining_seconds, target_progress
+            remaining_seconds = seconds
+            
+            # Widgets belong to the Tk thread
+            clock.after(0, show_remaining, seconds)
+            
+            # Update target progress for smooth animation
+            target_progress = countdown.progress()
+        
+        # A schedule fires at its exact wall-clock time, even after a pause
+        countdown = Countdown(remaining_seconds, clock, on_tick=on_tick, stop_event=stop_event, deadline=fire_time)
+        
         def run_timer():
             global timer_running, remaining_seconds, is_paused, target_progress
             
-            total_seconds = int(float(entry_time.get()) * 60)
-            
-            while remaining_seconds >= 0 and not stop_event.is_set():
-                if not is_paused:
-                    mins, secs = divmod(remaining_seconds, 60)
-                    
-                    # Color coding based on time remaining
-                    if remaining_seconds <= 10:
-                        color = "#ef4444"  # Red
-                    elif remaining_seconds <= 30:
-                        color = "#f59e0b"  # Orange
-                    else:
-                        color = "#0ea5e9"  # Blue
-                    
-                    label_timer.config(text=f"{mins:02d}:{secs:02d}", fg=color)
-                    
-                    # Update target progress for smooth animation
-                    target_progress = ((total_seconds - remaining_seconds) / total_seconds) * 100
-                    
-                    time.sleep(1)
-                    remaining_seconds -= 1
-                else:
-                    time.sleep(0.1)  # Check pause state frequently
+            finished = countdown.run()
+            remaining_seconds = countdown.remaining_seconds
             
-            if not stop_event.is_set() and remaining_seconds < 0:
+            if finished:
                 # Timer completed
                 target_progress = 100
                 label_timer.config(text="00:00", fg="#ef4444")
@@ -388,12 +354,16 @@ def start_countdown():
             is_paused = False
             start_button.config(text="▶️ Start Timer", state="normal")
             pause_button.config(state="disabled")
+            
+            # Recurring schedule: count down to its next time
+            if finished and len(alarm_schedules):
+                clock.after(0, start_countdown)
         
         timer_thread = threading.Thread(target=run_timer, daemon=True)
         timer_thread.start()
     
-    except ValueError:
-        messagebox.showerror("❌ Error", "Please enter a valid number!")
+    except ValueError as e:
+        messagebox.showerror("❌ Error", f"Please enter minutes or a schedule like 'weekdays 16:30'!\n{e}")
 
 def pause_countdown():
     """Pause/Resume the countdown"""
@@ -405,9 +375,14 @@ def pause_countdown():
     is_paused = not is_paused
     
     if is_paused:
+        countdown.pause()
         start_button.config(text="▶️ Resume Timer")
-        label_status.config(text="⏸️ Timer Paused", fg="#f59e0b")
+        if countdown.fixed:
+            label_status.config(text="⏸️ On hold, alarm time unchanged", fg="#f59e0b")
+        else:
+            label_status.config(text="⏸️ Timer Paused", fg="#f59e0b")
     else:
+        countdown.resume()
         start_button.config(text="⏸️ Pause Timer")
         label_status.config(text="⏱️ Timer Running...", fg="#10b981")
 
@@ -417,6 +392,7 @@ def reset_timer():
     
     stop_event.set()
     stop_alarm()
+    alarm_schedules.clear()
     timer_running = False
     is_paused = False
     remaining_seconds = 0
@@ -466,15 +442,13 @@ def change_to_night_theme():
     """Change to night theme"""
     global target_bg_color
     target_bg_color = [15, 23, 42]  # #0f172a
-    for star in stars:
-        star.change_theme(True)
+    star_view.set_theme(True)
 
 def change_to_day_theme():
     """Change to day theme"""
     global target_bg_color
     target_bg_color = [224, 242, 254]  # #e0f2fe
-    for star in stars:
-        star.change_theme(False)
+    star_view.set_theme(False)
 
 # ========================= EFFECTS =========================
 particles = []
@@ -482,39 +456,40 @@ shooting_stars = []
 
 def create_celebration_effect():
     """Create particle celebration effect"""
-    center_x = 210
-    center_y = 325
+    # Over the timer display, which sits 85px above the card centre
+    center_x = canvas_width / 2
+    center_y = canvas_height / 2 - 85 * ui_scale
     
     colors = ["#fde047", "#facc15", "#fb923c", "#f472b6", "#a78bfa"]
     
-    for _ in range(30):
+    for _ in range(max(10, int(30 * frame_clock.density_factor))):
         color = random.choice(colors)
         particle = Particle(canvas_bg, center_x, center_y, color, random.randint(3, 6))
         particles.append(particle)
 
-def update_effects():
-    """Update all visual effects"""
-    global particles, shooting_stars, current_progress
-    
-    # Update stars
-    for star in stars:
-        star.update()
-    
-    # Update particles
-    particles = [p for p in particles if p.update()]
-    
-    # Update shooting stars
-    shooting_stars = [s for s in shooting_stars if s.update()]
-    
-    # Randomly create shooting stars (rare)
-    if random.random() < 0.002 and len(target_bg_color) == 3 and target_bg_color[0] < 100:  # Only at night
-        shooting_star = ShootingStar(canvas_bg, 420, 820)
-        shooting_stars.append(shooting_star)
+def on_window_resize(event):
+    """Debounce relayout while the window is being dragged"""
+    global relayout_job
+    if event.widget is not root:
+        return
+    if relayout_job is not None:
+        clock.cancel(relayout_job)
+    relayout_job = clock.after(0.15, relayout, event.width, event.height)
+
+def relayout(width, height):
+    """Rescale effect bounds to the new window size"""
+    global relayout_job, canvas_width, canvas_height
+    relayout_job = None
+    if (width, height) == (canvas_width, canvas_height):
+        return
     
-    # Background transition
-    transition_background()
+    canvas_width, canvas_height = width, height
+    star_view.resize(width, height)
+
+def update_progress():
+    """Smooth progress bar animation"""
+    global current_progress
     
-    # Smooth progress bar animation
     if abs(current_progress - target_progress) > 0.1:
         # Smooth interpolation
         diff = target_progress - current_progress
@@ -523,8 +498,36 @@ def update_effects():
     else:
         current_progress = target_progress
         progress_bar['value'] = current_progress
+
+def update_particles(fraction=1.0):
+    """Move celebration particles, keeping only a fraction of them when thinned"""
+    global particles
+    
+    if fraction < 1.0:
+        keep = int(len(particles) * fraction)
+        for p in particles[keep:]:
+            canvas_bg.delete(p.particle)
+        particles = particles[:keep]
+    
+    particles = [p for p in particles if p.update()]
+
+def update_shooting_stars():
+    """Move shooting stars and randomly create new ones (rare)"""
+    global shooting_stars
     
-    root.after(50, update_effects)
+    shooting_stars = [s for s in shooting_stars if s.update()]
+    
+    if random.random() < 0.002 and len(target_bg_color) == 3 and target_bg_color[0] < 100:  # Only at night
+        shooting_star = ShootingStar(canvas_bg, canvas_width, canvas_height)
+        shooting_stars.append(shooting_star)
+
+def update_stars():
+    """Draw the shared stars"""
+    star_view.render(frame_clock.density_factor)
+
+def update_effects():
+    """Draw this window's effects, called by the shared frame clock"""
+    effect_scheduler.run(frame_clock.deadline)
 
 # ========================= PRESET BUTTONS =========================
 def set_preset_time(minutes):
@@ -533,30 +536,56 @@ def set_preset_time(minutes):
     entry_time.insert(0, str(minutes))
 
 # ========================= UI SETUP =========================
+# Ask Windows for real pixels instead of bitmap-stretching the window
+try:
+    import ctypes
+    ctypes.windll.shcore.SetProcessDpiAwareness(1)
+except:
+    pass
+
 root = tk.Tk()
+clock = TkClock(root)
+
+# Fonts are in points and already follow the DPI, so scale the pixel layout too
+ui_scale = max(1.0, root.winfo_fpixels('1i') / 96)
+canvas_width = int(BASE_WIDTH * ui_scale)
+canvas_height = int(BASE_HEIGHT * ui_scale)
+
 root.title("🎮 Gamer Wake Up Alarm Pro")
-root.geometry("420x820")
+root.geometry(f"{canvas_width}x{canvas_height}")
 root.configure(bg="#e0f2fe")
-root.resizable(False, False)
+root.resizable(True, True)
+root.minsize(int(390 * ui_scale), int(770 * ui_scale))
 
 # ========================= ANIMATED BACKGROUND =========================
-canvas_bg = tk.Canvas(root, width=420, height=820, bg="#e0f2fe", highlightthickness=0)
-canvas_bg.place(x=0, y=0)
-
-# Create stars (80 stars for better coverage)
-stars = []
-for _ in range(80):
-    star = Star(canvas_bg, 420, 820)
-    stars.append(star)
+canvas_bg = tk.Canvas(root, width=canvas_width, height=canvas_height, bg="#e0f2fe", highlightthickness=0)
+canvas_bg.place(x=0, y=0, relwidth=1, relheight=1)
+
+# Stars are simulated once per process and drawn by each window's view
+star_field = StarField(layers=PARALLAX_LAYERS)
+star_view = StarView(canvas_bg, star_field, canvas_width, canvas_height, ui_scale)
+frame_clock = FrameClock(clock, star_field)
+
+# Effects by priority: the progress bar always runs, decorations are shed first.
+# What gets shed is printed about every 10 seconds while it happens.
+shed_log = ShedLog(clock, on_summary=print)
+effect_scheduler = EffectScheduler(clock, on_report=shed_log.record)
+effect_scheduler.add("progress", update_progress, PRIORITY_ESSENTIAL, 0.002)
+effect_scheduler.add("background", transition_background, 1, 0.002)
+effect_scheduler.add("particles", update_particles, 2, 0.006, thin=True)
+effect_scheduler.add("shooting_stars", update_shooting_stars, 3, 0.002)
+effect_scheduler.add("stars", update_stars, 4, 0.008)
 
 # ========================= MAIN CARD =========================
 # Shadow
 shadow = tk.Frame(root, bg="#bae6fd")
-shadow.place(relx=0.5, rely=0.5, anchor="center", width=390, height=770)
+shadow.place(relx=0.5, rely=0.5, anchor="center",
+             width=int(390 * ui_scale), height=int(770 * ui_scale))
 
 # Main card
 card = tk.Frame(root, bg="white", bd=0, highlightthickness=0)
-card.place(relx=0.5, rely=0.5, anchor="center", width=385, height=765)
+card.place(relx=0.5, rely=0.5, anchor="center",
+           width=int(385 * ui_scale), height=int(765 * ui_scale))
 
 card.lift()
 
@@ -819,7 +848,9 @@ style.configure(
 )
 
 # ========================= START ANIMATION =========================
-update_effects()
+root.bind("<Configure>", on_window_resize)
+frame_clock.add_window(root, update_effects)
+frame_clock.start()
 
 # ========================= RUN =========================
 root.mainloop()
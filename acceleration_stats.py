@@ -0,0 +1,352 @@
+"""Streaming summary statistics for acceleration results.
+
+Reads lines of "V1 V2 Time" (the midterm program's three inputs), works
+out a = (V2 - V1) / Time in numpy chunks and keeps only running
+aggregates, so input of any length runs in constant memory:
+
+- count, mean and variance: each chunk's mean and squared deviations are
+  computed in two passes, and chunks are combined with Chan's parallel
+  formula
+- min and max
+- p50 / p95 / p99: a log-bucketed quantile sketch with 1% relative error
+- a fixed-bin histogram
+
+Aggregates can be saved and merged, so separate files or parallel workers
+can be summarised apart and combined later. Counts, min/max, the sketch
+and the histogram merge exactly; mean and variance merge with the usual
+floating-point rounding only.
+
+    python acceleration_stats.py < results.txt
+    python acceleration_stats.py --save part1.json < part1.txt
+    python acceleration_stats.py --merge part1.json part2.json
+"""
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+from kinematics import acceleration
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# ========================= MOMENTS =========================
+class Moments:
+    """Count, mean, variance, min and max of a stream"""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        if len(values) == 0:
+            return
+        chunk = Moments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def variance(self):
+        """Sample variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls()
+        moments.__dict__.update(data)
+        return moments
+
+
+# ========================= QUANTILE SKETCH =========================
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets, so any quantile is within
+    relative_accuracy of the true value. Merging just adds bucket counts,
+    which gives the same sketch however the input was split as long as
+    neither side has more than max_buckets buckets. Past that _collapse
+    folds the smallest magnitudes together, and which buckets get folded
+    can depend on the split. Only those smallest values lose accuracy.
+    """
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}  # bucket -> count
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _add_side(self, store, magnitudes):
+        buckets = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        for bucket, count in zip(*np.unique(buckets, return_counts=True)):
+            store[int(bucket)] = store.get(int(bucket), 0) + int(count)
+        self._collapse(store)
+
+    def _collapse(self, store):
+        """Fold the smallest magnitudes together if there are too many buckets"""
+        if len(store) <= self.max_buckets:
+            return
+        buckets = sorted(store)
+        folded = len(buckets) - self.max_buckets + 1
+        keep = buckets[folded - 1]
+        for bucket in buckets[:folded - 1]:
+            store[keep] += store.pop(bucket)
+
+    def add(self, values):
+        self.count += len(values)
+        self.zeros += int(np.count_nonzero(values == 0))
+        positive = values[values > 0]
+        negative = values[values < 0]
+        if len(positive):
+            self._add_side(self.positive, positive)
+        if len(negative):
+            self._add_side(self.negative, -negative)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in other_store.items():
+                store[bucket] = store.get(bucket, 0) + count
+            self._collapse(store)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                return -self._value(bucket)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if seen > rank:
+                return self._value(bucket)
+        return self._value(max(self.positive))
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "positive": self.positive,
+            "negative": self.negative,
+            "zeros": self.zeros,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.positive = {int(bucket): count for bucket, count in data["positive"].items()}
+        sketch.negative = {int(bucket): count for bucket, count in data["negative"].items()}
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        return sketch
+
+
+# ========================= HISTOGRAM =========================
+class Histogram:
+    """Fixed-bin histogram with under- and overflow counts"""
+    def __init__(self, low=-20.0, high=20.0, bins=40):
+        if not high > low or bins < 1:
+            raise ValueError("Histogram needs low < high and at least one bin")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, values):
+        counts, _ = np.histogram(values, bins=self.bins, range=(self.low, self.high))
+        self.counts += counts
+        self.underflow += int(np.count_nonzero(values < self.low))
+        self.overflow += int(np.count_nonzero(values > self.high))
+
+    def merge(self, other):
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def edges(self):
+        return np.linspace(self.low, self.high, self.bins + 1)
+
+    def to_dict(self):
+        return {
+            "low": self.low, "high": self.high, "bins": self.bins,
+            "counts": self.counts.tolist(), "underflow": self.underflow, "overflow": self.overflow,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["low"], data["high"], data["bins"])
+        histogram.counts = np.array(data["counts"], dtype=np.int64)
+        histogram.underflow = data["underflow"]
+        histogram.overflow = data["overflow"]
+        return histogram
+
+
+# ========================= AGGREGATE =========================
+class AccelerationStats:
+    """Every running aggregate of a stream of accelerations"""
+    def __init__(self, histogram=None, relative_accuracy=0.01):
+        self.moments = Moments()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.histogram = histogram or Histogram()
+        self.invalid = 0  # Results that were not finite, e.g. Time = 0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        finite = values[np.isfinite(values)]
+        self.invalid += len(values) - len(finite)
+        self.moments.add(finite)
+        self.sketch.add(finite)
+        self.histogram.add(finite)
+
+    def add_inputs(self, v1, v2, time):
+        """Add the accelerations of arrays of V1, V2 and Time"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.add(acceleration(np.asarray(v1, dtype=np.float64),
+                                  np.asarray(v2, dtype=np.float64),
+                                  np.asarray(time, dtype=np.float64)))
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+        self.invalid += other.invalid
+
+    def to_dict(self):
+        return {
+            "moments": self.moments.to_dict(),
+            "sketch": self.sketch.to_dict(),
+            "histogram": self.histogram.to_dict(),
+            "invalid": self.invalid,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(Histogram.from_dict(data["histogram"]))
+        stats.moments = Moments.from_dict(data["moments"])
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        stats.invalid = data["invalid"]
+        return stats
+
+    def report(self):
+        moments = self.moments
+        lines = [
+            f"count    : {moments.count}" + (f" ({self.invalid} invalid skipped)" if self.invalid else ""),
+            f"mean     : {moments.mean:.6g} m/s^2",
+            f"variance : {moments.variance():.6g}",
+            f"std dev  : {math.sqrt(moments.variance()):.6g}",
+            f"min/max  : {moments.min:.6g} / {moments.max:.6g}",
+        ]
+        for q in QUANTILES:
+            lines.append(f"p{int(q * 100):<7} : {self.sketch.quantile(q):.6g}")
+
+        histogram = self.histogram
+        lines.append("histogram:")
+        if histogram.underflow:
+            lines.append(f"  < {histogram.low:g} : {histogram.underflow}")
+        edges = histogram.edges()
+        for position, (low, high, count) in enumerate(zip(edges[:-1], edges[1:], histogram.counts)):
+            if count:
+                # np.histogram counts values equal to the top edge in the last bin
+                close = "]" if position == histogram.bins - 1 else ")"
+                lines.append(f"  [{low:g}, {high:g}{close} : {count}")
+        if histogram.overflow:
+            lines.append(f"  > {histogram.high:g} : {histogram.overflow}")
+        return "\n".join(lines)
+
+
+def read_inputs(lines, chunk_size=65536):
+    """Yield (V1, V2, Time) arrays from lines of "V1 V2 Time" """
+    rows = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            v1, v2, time = (float(value) for value in line.replace(",", " ").split()[:3])
+        except ValueError:
+            raise ValueError(f"Line {number}: expected 'V1 V2 Time', got {line!r}") from None
+        rows.append([v1, v2, time])
+        if len(rows) >= chunk_size:
+            yield np.array(rows).T
+            rows = []
+    if rows:
+        yield np.array(rows).T
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary statistics of (V2 - V1) / Time over any number of inputs")
+    parser.add_argument("--save", metavar="FILE", help="write the aggregate to FILE for a later --merge")
+    parser.add_argument("--merge", nargs="+", metavar="FILE", help="combine saved aggregates instead of reading stdin")
+    parser.add_argument("--hist", nargs=3, type=float, metavar=("LOW", "HIGH", "BINS"), default=(-20, 20, 40))
+    parser.add_argument("--chunk", type=int, default=65536, help="inputs per chunk")
+    args = parser.parse_args()
+
+    if args.merge:
+        stats = None
+        for path in args.merge:
+            with open(path, encoding="utf-8") as f:
+                part = AccelerationStats.from_dict(json.load(f))
+            if stats is None:
+                stats = part
+                continue
+            try:
+                stats.merge(part)
+            except ValueError as e:
+                parser.error(f"{path}: {e}")
+    else:
+        low, high, bins = args.hist
+        stats = AccelerationStats(Histogram(low, high, int(bins)))
+        try:
+            for v1, v2, time in read_inputs(sys.stdin, args.chunk):
+                stats.add_inputs(v1, v2, time)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f)
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
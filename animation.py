@@ -0,0 +1,415 @@
+"""Shared animation state for alarm windows.
+
+One FrameClock ticks every alarm window in the process. The star positions
+live in a single StarField in window-independent (0..1) coordinates and are
+stepped once per frame; each window only owns a StarView that draws the
+shared stars on its own canvas at its own size and theme. Hidden or
+minimised windows are skipped.
+
+With layers > 0 the field runs in parallax mode: stars are sorted into a
+few depth layers that share one velocity, so a view moves a whole layer
+with one tagged canvas.move() per frame and only redraws the stars that
+wrapped past an edge. Run bench_starfield.py to compare the two modes.
+
+Inside a window, an EffectScheduler runs the effect subsystems in priority
+order against the frame budget and sheds or thins the decorative ones
+when a frame runs long. A ShedLog adds up its frame reports and sums
+them up every few seconds while anything is being shed.
+"""
+import random
+import tkinter as tk
+from collections import Counter, namedtuple
+
+# Base window the star speeds and density were tuned for
+BASE_WIDTH = 420
+BASE_HEIGHT = 820
+
+# Effect density budget: 80 stars on the base window, scaled by area and
+# by how expensive the last frames were
+FRAME_INTERVAL = 0.05
+FRAME_BUDGET = 0.02  # Effects may use 20ms of each 50ms frame
+STAR_DENSITY = 80 / (BASE_WIDTH * BASE_HEIGHT)
+MIN_STARS = 20
+MAX_STARS = 400
+
+# Parallax mode: far layers are small and slow, near layers big and fast
+PARALLAX_LAYERS = 4
+
+# Effect priorities: lower runs first, PRIORITY_ESSENTIAL is never shed
+PRIORITY_ESSENTIAL = 0
+MIN_FRACTION = 0.25  # Thinned effects still get at least this share of their work
+
+# Day colors (blue tones)
+DAY_COLORS = ["#bae6fd", "#7dd3fc", "#38bdf8", "#0ea5e9", "#ffffff", "#93c5fd"]
+# Night colors (yellow/gold tones)
+NIGHT_COLORS = ["#fef08a", "#fde047", "#facc15", "#eab308", "#ffffff", "#fbbf24", "#fcd34d"]
+
+
+def star_budget(width, height, density_factor=1.0, max_stars=MAX_STARS):
+    """Number of stars a canvas of this size may draw"""
+    count = round(width * height * STAR_DENSITY * density_factor)
+    return max(MIN_STARS, min(max_stars, count))
+
+
+# ========================= STAR SIMULATION =========================
+class StarState:
+    """Position and motion of one star, in fractions of the canvas size"""
+    __slots__ = ("x", "y", "size", "speed", "direction", "color_seed", "layer")
+
+    def __init__(self, layer=None, layers=0):
+        self.x = random.random()
+        self.y = random.random()
+        self.color_seed = random.randrange(1 << 16)
+        self.layer = layer
+
+        if layer is None:
+            self.size = random.randint(2, 7)
+            self.speed = random.uniform(0.15, 0.6) / BASE_HEIGHT
+            self.direction = random.uniform(-0.25, 0.25) / BASE_WIDTH
+        else:
+            # Speed and drift are shared through the layer velocity
+            depth = (layer + 1) / layers
+            self.size = random.randint(2, 2 + round(5 * depth))
+            self.speed = 0.0
+            self.direction = 0.0
+
+
+class StarField:
+    """Star motion shared by every window, stepped once per frame"""
+    def __init__(self, count=0, layers=0):
+        self.stars = []
+        self.layers = layers
+        self.frame = 0
+        self.wrapped = []  # Indexes of stars that wrapped during the last step
+        self.wrap_frames = []  # Per star, the frame it last wrapped in
+
+        # (dx, dy) per layer, in fractions of the canvas per frame
+        self.layer_velocity = []
+        for layer in range(layers):
+            depth = (layer + 0.5) / layers
+            self.layer_velocity.append((
+                random.uniform(-0.25, 0.25) * depth / BASE_WIDTH,
+                (0.15 + 0.45 * depth) / BASE_HEIGHT,
+            ))
+
+        self.ensure(count)
+
+    def ensure(self, count):
+        """Grow the field so views can draw at least count stars"""
+        while len(self.stars) < count:
+            self.wrap_frames.append(self.frame)
+            if self.layers:
+                self.stars.append(StarState(len(self.stars) % self.layers, self.layers))
+            else:
+                self.stars.append(StarState())
+
+    def step(self):
+        self.frame += 1
+        wrapped = []
+        velocity = self.layer_velocity
+
+        for index, star in enumerate(self.stars):
+            if star.layer is None:
+                star.y += star.speed
+                star.x += star.direction
+            else:
+                dx, dy = velocity[star.layer]
+                star.y += dy
+                star.x += dx
+
+            # Reset position if out of bounds
+            if star.y > 1 + 20 / BASE_HEIGHT:
+                star.y = random.randint(-50, -10) / BASE_HEIGHT
+                star.x = random.random()
+                if star.layer is None:
+                    star.direction = random.uniform(-0.25, 0.25) / BASE_WIDTH
+                star.color_seed = random.randrange(1 << 16)
+                wrapped.append(index)
+            elif star.x < -10 / BASE_WIDTH:
+                star.x = 1 + 10 / BASE_WIDTH
+                wrapped.append(index)
+            elif star.x > 1 + 10 / BASE_WIDTH:
+                star.x = -10 / BASE_WIDTH
+                wrapped.append(index)
+
+        self.wrapped = wrapped
+        for index in wrapped:
+            self.wrap_frames[index] = self.frame
+
+
+# ========================= STAR RENDERING =========================
+class StarView:
+    """Draws the shared StarField on one window's canvas"""
+    def __init__(self, canvas, field, width, height, scale=1.0, max_stars=MAX_STARS):
+        self.canvas = canvas
+        self.field = field
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.max_stars = max_stars
+        self.is_night = False
+        self.items = []  # (glow, star) canvas ids, one pair per drawn star
+        self.drawn_frame = None  # Field frame the canvas currently shows (parallax mode)
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.drawn_frame = None
+
+    def set_theme(self, is_night):
+        if is_night != self.is_night:
+            self.is_night = is_night
+            self.drawn_frame = None
+
+    def _color(self, star):
+        palette = NIGHT_COLORS if self.is_night else DAY_COLORS
+        return palette[star.color_seed % len(palette)]
+
+    def _sync_count(self, count):
+        if count == len(self.items):
+            return
+        self.field.ensure(count)
+        while len(self.items) < count:
+            star = self.field.stars[len(self.items)]
+            tags = () if star.layer is None else (f"starlayer{star.layer}",)
+            glow = self.canvas.create_oval(0, 0, 0, 0, fill="", outline="", width=0, tags=tags)
+            item = self.canvas.create_oval(0, 0, 0, 0, fill="", outline="", tags=tags)
+            self.items.append((glow, item))
+        while len(self.items) > count:
+            for item in self.items.pop():
+                self.canvas.delete(item)
+        self.drawn_frame = None
+
+    def _draw(self, index):
+        glow, item = self.items[index]
+        star = self.field.stars[index]
+        x = star.x * self.width
+        y = star.y * self.height
+        size = star.size * self.scale
+        self.canvas.coords(item, x, y, x + size, y + size)
+        self.canvas.coords(glow, x - 2, y - 2, x + size + 2, y + size + 2)
+        self.canvas.itemconfig(item, fill=self._color(star))
+
+    def render(self, density_factor=1.0):
+        self._sync_count(star_budget(self.width, self.height, density_factor, self.max_stars))
+
+        if not self.field.layers:
+            for index in range(len(self.items)):
+                self._draw(index)
+            return
+
+        field = self.field
+        if self.drawn_frame is None:
+            # New size, theme or star count
+            for index in range(len(self.items)):
+                self._draw(index)
+        elif self.drawn_frame < field.frame:
+            # One move per layer, then fix up the stars that wrapped. Frames
+            # skipped while hidden or shed are caught up in the same move.
+            behind = field.frame - self.drawn_frame
+            for layer, (dx, dy) in enumerate(field.layer_velocity):
+                self.canvas.move(f"starlayer{layer}", dx * self.width * behind, dy * self.height * behind)
+
+            if behind == 1:
+                wrapped = field.wrapped
+            else:
+                wrapped = [index for index, frame in enumerate(field.wrap_frames) if frame > self.drawn_frame]
+            for index in wrapped:
+                if index < len(self.items):
+                    self._draw(index)
+        self.drawn_frame = field.frame
+
+
+# ========================= FRAME CLOCK =========================
+class FrameClock:
+    """One frame loop for every alarm window in the process"""
+    def __init__(self, clock, field, interval=FRAME_INTERVAL):
+        self.clock = clock
+        self.field = field
+        self.interval = interval
+        self.windows = []  # (window, render) pairs
+        self.density_factor = 1.0
+        self.frame_cost = 0.0
+        self.frame_count = 0
+        self.lateness = 0.0  # How long after its due time the last frame started
+        self.deadline = 0.0  # Time by which the window being rendered should be done
+        self._job = None
+        self._due = None  # When the next tick should start
+
+    def add_window(self, window, render):
+        """Call render() every frame while window is visible"""
+        self.windows.append((window, render))
+        window.bind("<Destroy>", lambda e: e.widget is window and self.remove_window(window), add="+")
+
+    def remove_window(self, window):
+        self.windows = [(w, r) for w, r in self.windows if w is not window]
+
+    def start(self):
+        if self._job is None:
+            self.tick()
+
+    def stop(self):
+        if self._job is not None:
+            self.clock.cancel(self._job)
+            self._job = None
+            self._due = None
+
+    def tick(self):
+        frame_start = self.clock.monotonic()
+        frame_deadline = frame_start + FRAME_BUDGET
+        # Tk redraws the canvas when it goes idle, after tick() returns, so
+        # drawing time only shows up as this frame starting late
+        self.lateness = 0.0 if self._due is None else max(0.0, frame_start - self._due)
+
+        visible = [render for window, render in self.windows if is_visible(window)]
+        if visible:
+            self.field.step()
+        for position, render in enumerate(visible):
+            # Each window gets an equal share of what is left of the budget,
+            # so the first window can't leave nothing for the others
+            now = self.clock.monotonic()
+            self.deadline = now + max(0.0, frame_deadline - now) / (len(visible) - position)
+            render()
+
+        frame_end = self.clock.monotonic()
+        self.adapt_density(frame_end - frame_start + self.lateness)
+        self._due = frame_end + self.interval
+        self._job = self.clock.after(self.interval, self.tick)
+
+    def adapt_density(self, cost):
+        """Track the frame cost (Python work plus drawing) and grow or shrink the effect density"""
+        self.frame_cost = self.frame_cost * 0.9 + cost * 0.1
+        self.frame_count += 1
+        if self.frame_count % 20:  # Re-evaluate about once per second
+            return
+
+        if self.frame_cost > FRAME_BUDGET:
+            self.density_factor = max(0.25, self.density_factor * 0.8)
+        elif self.frame_cost < FRAME_BUDGET * 0.5:
+            self.density_factor = min(1.0, self.density_factor * 1.1)
+
+
+# ========================= EFFECT SCHEDULER =========================
+FrameReport = namedtuple("FrameReport", ["elapsed", "thinned", "dropped", "shed"])
+
+
+class Effect:
+    """One effect subsystem of a window"""
+    __slots__ = ("name", "update", "priority", "budget", "thin", "cost")
+
+    def __init__(self, name, update, priority, budget, thin):
+        self.name = name
+        self.update = update
+        self.priority = priority
+        self.budget = budget
+        self.thin = thin
+        self.cost = 0.0  # Smoothed seconds for a full update
+
+
+class EffectScheduler:
+    """Runs a window's effects by priority inside the frame budget.
+
+    Essential effects always run. When the frame is running out of time,
+    thinnable effects are called with the fraction of their work that
+    still fits, and the rest are skipped for this frame. Every run
+    produces a FrameReport of what was thinned and dropped and roughly how
+    many seconds of work that saved.
+    """
+    def __init__(self, clock, budget=FRAME_BUDGET, on_report=None):
+        self.clock = clock
+        self.budget = budget
+        self.on_report = on_report
+        self.effects = []
+        self.last_report = None
+
+    def add(self, name, update, priority, budget, thin=False):
+        """Register update() (or update(fraction) if thin) with a per-frame time budget"""
+        self.effects.append(Effect(name, update, priority, budget, thin))
+        self.effects.sort(key=lambda effect: effect.priority)
+
+    def run(self, deadline=None):
+        start = self.clock.monotonic()
+        if deadline is None:
+            deadline = start + self.budget
+
+        thinned = {}
+        dropped = []
+        shed = 0.0
+        for effect in self.effects:
+            fraction = 1.0
+            if effect.priority > PRIORITY_ESSENTIAL:
+                available = min(deadline - self.clock.monotonic(), effect.budget)
+                if effect.cost > available:
+                    if effect.thin and available > 0:
+                        fraction = max(MIN_FRACTION, available / effect.cost)
+                    else:
+                        dropped.append(effect.name)
+                        shed += effect.cost
+                        # Let the estimate decay so a skipped effect gets retried
+                        effect.cost *= 0.9
+                        continue
+
+            effect_start = self.clock.monotonic()
+            if effect.thin:
+                effect.update(fraction)
+            else:
+                effect.update()
+            cost = (self.clock.monotonic() - effect_start) / fraction
+            effect.cost = effect.cost * 0.8 + cost * 0.2
+
+            if fraction < 1.0:
+                thinned[effect.name] = fraction
+                shed += effect.cost * (1 - fraction)
+
+        self.last_report = FrameReport(self.clock.monotonic() - start, thinned, dropped, shed)
+        if self.on_report:
+            self.on_report(self.last_report)
+        return self.last_report
+
+
+class ShedLog:
+    """Running totals of what an EffectScheduler shed, fed by its on_report"""
+    def __init__(self, clock, period=10.0, on_summary=None):
+        self.clock = clock
+        self.period = period
+        self.on_summary = on_summary
+        self.frames = 0
+        self.shed_frames = 0  # Frames that dropped or thinned something
+        self.dropped = Counter()  # Effect name -> frames it was skipped
+        self.thinned = Counter()  # Effect name -> frames it was thinned
+        self.seconds = 0.0  # Estimated work saved
+        self._summary_at = None
+        self._summary_frames = 0
+
+    def record(self, report):
+        self.frames += 1
+        if report.dropped or report.thinned:
+            self.shed_frames += 1
+            self.dropped.update(report.dropped)
+            self.thinned.update(report.thinned.keys())
+            self.seconds += report.shed
+
+        now = self.clock.monotonic()
+        if self._summary_at is None:
+            self._summary_at = now
+        elif now - self._summary_at >= self.period:
+            self._summary_at = now
+            if self.on_summary and self.shed_frames > self._summary_frames:
+                self.on_summary(self.summary())
+            self._summary_frames = self.shed_frames
+
+    def summary(self):
+        parts = [f"Effects shed in {self.shed_frames} of {self.frames} frames, about {self.seconds * 1000:.0f}ms saved"]
+        if self.dropped:
+            parts.append("dropped " + ", ".join(f"{name} x{count}" for name, count in self.dropped.most_common()))
+        if self.thinned:
+            parts.append("thinned " + ", ".join(f"{name} x{count}" for name, count in self.thinned.most_common()))
+        return "; ".join(parts)
+
+
+def is_visible(window):
+    """True if the window is mapped and not minimised"""
+    try:
+        return bool(window.winfo_viewable())
+    except tk.TclError:
+        return False
@@ -0,0 +1,243 @@
+"""Streaming playback for custom alarm sounds.
+
+Large custom files used to be loaded in full on every alarm. Now:
+
+- probe() checks a file once, when it is selected, and caches what it
+  found (format, length, where the samples start). probe_async() runs it
+  on a background thread so the UI never waits on the disk.
+- PCM WAV files are memory-mapped and played in fixed-size chunks. Each
+  chunk is sliced from the mapping without reading the file into memory,
+  then copied once into its own mixer Sound. At most ChunkRing.slots of
+  those copies wait ahead of the speaker, so memory stays flat however
+  long the file is.
+- MP3/OGG files go through pygame's music stream, which already decodes
+  them incrementally with a fixed buffer.
+"""
+import mmap
+import os
+import struct
+import threading
+from collections import deque, namedtuple
+
+# Try to import pygame for playback
+try:
+    from pygame import mixer
+    PYGAME_AVAILABLE = True
+except ImportError:
+    PYGAME_AVAILABLE = False
+
+AudioInfo = namedtuple("AudioInfo", [
+    "path", "format", "size", "mtime",
+    "channels", "sample_rate", "sample_width",
+    "data_offset", "data_size", "duration",
+])
+
+CHUNK_SECONDS = 0.5
+RING_SLOTS = 4
+
+
+# ========================= PROBING =========================
+def _probe_wav(f, size):
+    """Walk the RIFF chunks, returns (format tag, channels, rate, width, data offset, data size)"""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+
+    fmt = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            raise ValueError("WAV file has no audio data")
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+
+        if chunk_id == b"fmt ":
+            body = f.read(chunk_size)
+            if len(body) < 16:
+                raise ValueError("Broken WAV format header")
+            tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            if tag == 0xFFFE and len(body) >= 26:
+                tag = struct.unpack("<H", body[24:26])[0]  # WAVE_FORMAT_EXTENSIBLE sub-format
+            fmt = (tag, channels, rate, bits // 8)
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data comes before its format header")
+            offset = f.tell()
+            data_size = min(chunk_size, size - offset)  # Tolerate truncated files
+            tag, channels, rate, width = fmt
+            if not channels or not rate or not width:
+                raise ValueError("Broken WAV format header")
+            return tag, channels, rate, width, offset, data_size - data_size % (channels * width)
+        else:
+            f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def probe(path):
+    """Check an alarm sound file and read its metadata, raises ValueError if it is unusable"""
+    stat = os.stat(path)
+    if stat.st_size == 0:
+        raise ValueError("The file is empty")
+
+    with open(path, "rb") as f:
+        head = f.read(12)
+        f.seek(0)
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            tag, channels, rate, width, offset, data_size = _probe_wav(f, stat.st_size)
+            duration = data_size / (channels * width * rate)
+            # Only plain PCM can be streamed, other encodings go to the music stream
+            kind = "wav" if tag == 1 else "wav-encoded"
+            return AudioInfo(path, kind, stat.st_size, stat.st_mtime,
+                             channels, rate, width, offset, data_size, duration)
+
+    if head[:4] == b"OggS":
+        kind = "ogg"
+    elif head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        kind = "mp3"
+    else:
+        raise ValueError("Unsupported audio file (use MP3, WAV or OGG)")
+    return AudioInfo(path, kind, stat.st_size, stat.st_mtime, None, None, None, None, None, None)
+
+
+class ProbeCache:
+    """Probe results by path, dropped when the file changes on disk"""
+    def __init__(self):
+        self._infos = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Cached AudioInfo, or None if the file was never probed or has changed"""
+        with self._lock:
+            info = self._infos.get(path)
+        if info is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime) != (info.size, info.mtime):
+            return None
+        return info
+
+    def probe(self, path):
+        info = self.get(path)
+        if info is None:
+            info = probe(path)
+            with self._lock:
+                self._infos[path] = info
+        return info
+
+    def probe_async(self, path, callback):
+        """Probe on a background thread, then call callback(info, error)"""
+        def run():
+            try:
+                info = self.probe(path)
+            except Exception as e:  # Any failure still gets an answer, or the UI waits forever
+                callback(None, e)
+            else:
+                callback(info, None)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+# ========================= RING BUFFER =========================
+class ChunkRing:
+    """Fixed number of decoded chunks waiting between the reader and the speaker"""
+    def __init__(self, slots=RING_SLOTS):
+        self.slots = slots
+        self._chunks = deque()
+        self._closed = False
+        self._ready = threading.Condition()
+
+    def put(self, chunk):
+        """Wait for a free slot, returns False if the ring was closed"""
+        with self._ready:
+            while len(self._chunks) >= self.slots and not self._closed:
+                self._ready.wait(0.1)
+            if self._closed:
+                return False
+            self._chunks.append(chunk)
+            self._ready.notify_all()
+            return True
+
+    def get(self):
+        """Wait for the next chunk, returns None once the ring is closed and empty"""
+        with self._ready:
+            while not self._chunks and not self._closed:
+                self._ready.wait(0.1)
+            if not self._chunks:
+                return None
+            chunk = self._chunks.popleft()
+            self._ready.notify_all()
+            return chunk
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+
+# ========================= PLAYBACK =========================
+def can_stream(info):
+    """True if the mixer can play this file's raw samples as they are"""
+    if not PYGAME_AVAILABLE or info.format != "wav" or mixer.get_init() is None:
+        return False
+    rate, bits, channels = mixer.get_init()
+    width = {8: 1, -16: 2}.get(bits)  # WAV stores 8-bit unsigned, 16-bit signed
+    return (rate, width, channels) == (info.sample_rate, info.sample_width, info.channels)
+
+
+class WavStream:
+    """Plays a PCM WAV file chunk by chunk from a memory map"""
+    def __init__(self, info, clock, chunk_seconds=CHUNK_SECONDS, slots=RING_SLOTS):
+        frame_size = info.channels * info.sample_width
+        self.info = info
+        self.clock = clock
+        self.chunk_bytes = max(1, int(info.sample_rate * chunk_seconds)) * frame_size
+        self.slots = slots
+
+    def _read(self, ring, loops, keep_playing):
+        info = self.info
+        with open(info.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = memoryview(mapped)[info.data_offset:info.data_offset + info.data_size]
+            try:
+                for _ in range(loops + 1):
+                    for start in range(0, len(data), self.chunk_bytes):
+                        if not keep_playing():
+                            return
+                        # The slice is a view, mixer.Sound copies it into the chunk
+                        sound = mixer.Sound(buffer=data[start:start + self.chunk_bytes])
+                        if not ring.put(sound):
+                            return
+            finally:
+                data.release()
+                ring.close()
+
+    def play(self, loops=0, keep_playing=lambda: True):
+        """Play the file loops + 1 times, returns when done or keep_playing() is False"""
+        ring = ChunkRing(self.slots)
+        reader = threading.Thread(target=self._read, args=(ring, loops, keep_playing), daemon=True)
+        reader.start()
+
+        channel = None
+        try:
+            while keep_playing():
+                sound = ring.get()
+                if sound is None:
+                    break
+                if channel is None:
+                    channel = sound.play()
+                    if channel is None:
+                        break
+                    continue
+                # The channel holds one queued sound, wait until that slot frees up
+                while channel.get_queue() is not None and keep_playing():
+                    self.clock.sleep(0.02)
+                channel.queue(sound)
+
+            while channel is not None and channel.get_busy() and keep_playing():
+                self.clock.sleep(0.1)
+        finally:
+            ring.close()
+            if channel is not None:
+                channel.stop()
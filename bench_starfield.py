@@ -0,0 +1,95 @@
+"""Benchmark the per-star and parallax starfield modes.
+
+Counts the canvas calls each mode makes per frame as the star count grows,
+and times real Tk rendering when a display is available.
+
+    python bench_starfield.py
+    python bench_starfield.py --stars 100 400 1600 --frames 200
+"""
+import argparse
+import time
+import tkinter as tk
+
+from animation import BASE_WIDTH, BASE_HEIGHT, PARALLAX_LAYERS, StarField, StarView
+
+
+class CallCounter:
+    """Stands in for a canvas and counts the calls made to it"""
+    def __init__(self, canvas=None):
+        self.canvas = canvas
+        self.calls = 0
+        self._next_id = 0
+
+    def _call(self, name, *args, **kwargs):
+        self.calls += 1
+        if self.canvas is not None:
+            return getattr(self.canvas, name)(*args, **kwargs)
+        self._next_id += 1
+        return self._next_id
+
+    def create_oval(self, *args, **kwargs):
+        return self._call("create_oval", *args, **kwargs)
+
+    def coords(self, *args):
+        return self._call("coords", *args)
+
+    def itemconfig(self, *args, **kwargs):
+        return self._call("itemconfig", *args, **kwargs)
+
+    def move(self, *args):
+        return self._call("move", *args)
+
+    def delete(self, *args):
+        return self._call("delete", *args)
+
+
+def run(stars, layers, frames, canvas=None):
+    """Returns (canvas calls per frame, ms per frame)"""
+    field = StarField(stars, layers)
+    counter = CallCounter(canvas)
+    view = StarView(counter, field, BASE_WIDTH, BASE_HEIGHT, max_stars=stars)
+
+    # The base window holds 80 stars, scale the density up to the requested count
+    density_factor = stars / 80
+    view.render(density_factor)
+
+    counter.calls = 0
+    started = time.perf_counter()
+    for _ in range(frames):
+        field.step()
+        view.render(density_factor)
+        if canvas is not None:
+            canvas.update_idletasks()
+    elapsed = time.perf_counter() - started
+    return counter.calls / frames, elapsed / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare starfield rendering modes")
+    parser.add_argument("--stars", type=int, nargs="+", default=[80, 200, 400, 800, 1600])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--layers", type=int, default=PARALLAX_LAYERS)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+        canvas = tk.Canvas(root, width=BASE_WIDTH, height=BASE_HEIGHT)
+        canvas.pack()
+    except tk.TclError:
+        root = canvas = None
+        print("No display, counting canvas calls only\n")
+
+    print(f"{'stars':>6} {'mode':<10} {'calls/frame':>12} {'ms/frame':>9}")
+    for stars in args.stars:
+        for mode, layers in (("per-star", 0), ("parallax", args.layers)):
+            if canvas is not None:
+                canvas.delete("all")
+            calls, ms = run(stars, layers, args.frames, canvas)
+            print(f"{stars:>6} {mode:<10} {calls:>12.1f} {ms:>9.3f}")
+
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
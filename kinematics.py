@@ -0,0 +1,133 @@
+"""Streaming kinematics for velocity time series.
+
+Extends the midterm acceleration program, a = (V2 - V1) / Time, from two
+typed-in velocities to long telemetry series of (timestamp, velocity)
+samples that arrive in chunks:
+
+- acceleration: (v[i] - v[i-1]) / (t[i] - t[i-1])
+- windowed: (v[i] - v[i-w]) / (t[i] - t[i-w]) over the last w samples
+- jerk: change of acceleration between neighbouring samples, using the
+  interval midpoints as acceleration timestamps
+- rolling: mean of the last n accelerations
+
+Each chunk is computed with numpy. The stream carries just enough samples
+across chunk boundaries to continue the computation, so memory stays
+bounded and the concatenated output is bit-for-bit identical to computing
+the whole array at once. Values that need samples from before the start
+of the series are NaN.
+
+    python kinematics.py < telemetry.txt   # lines of "time velocity"
+"""
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+Kinematics = namedtuple("Kinematics", ["time", "velocity", "acceleration", "windowed", "jerk", "rolling"])
+
+
+def acceleration(v1, v2, time):
+    """The midterm formula: a = (V2 - V1) / Time"""
+    return (v2 - v1) / time
+
+
+class KinematicsStream:
+    """Computes kinematics chunk by chunk with state carried between chunks"""
+    def __init__(self, window=5, average=10):
+        if window < 1 or average < 1:
+            raise ValueError("window and average must be at least 1")
+        self.window = window
+        self.average = average
+
+        # Samples before the first chunk are NaN, so early results come out NaN
+        self.carry = max(window, average, 2)
+        self._time = np.full(self.carry, np.nan)
+        self._velocity = np.full(self.carry, np.nan)
+
+    def push(self, time, velocity):
+        """Add one chunk of samples, returns Kinematics arrays for that chunk"""
+        time = np.asarray(time, dtype=np.float64)
+        velocity = np.asarray(velocity, dtype=np.float64)
+        if time.shape != velocity.shape or time.ndim != 1:
+            raise ValueError("time and velocity must be 1-D arrays of the same length")
+
+        t = np.concatenate((self._time, time))
+        v = np.concatenate((self._velocity, velocity))
+        k = self.carry
+
+        dt = np.diff(t)
+        if np.any(dt <= 0):
+            raise ValueError("timestamps must be strictly increasing")
+
+        with np.errstate(invalid="ignore"):
+            # accel[j] belongs to sample j + 1, mid[j] is the middle of its interval
+            accel = np.diff(v) / dt
+            mid = (t[1:] + t[:-1]) / 2
+
+            w = self.window
+            windowed = (v[k:] - v[k - w:-w]) / (t[k:] - t[k - w:-w])
+
+            jerk = (accel[k - 1:] - accel[k - 2:-1]) / (mid[k - 1:] - mid[k - 2:-1])
+
+            # Add the window up term by term so every sample is summed in
+            # the same order no matter where the chunk boundaries fall
+            n = self.average
+            total = accel[k - n:len(accel) - n + 1].copy()
+            for offset in range(1, n):
+                total += accel[k - n + offset:len(accel) - n + 1 + offset]
+            rolling = total / n
+
+        self._time = t[-k:].copy()
+        self._velocity = v[-k:].copy()
+        return Kinematics(time, velocity, accel[k - 1:], windowed, jerk, rolling)
+
+
+def compute(time, velocity, window=5, average=10):
+    """Kinematics of a whole series in one go"""
+    return KinematicsStream(window, average).push(time, velocity)
+
+
+def read_chunks(lines, chunk_size=65536):
+    """Yield (time, velocity) arrays from lines of "time velocity" """
+    times = []
+    velocities = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            t, v = line.replace(",", " ").split()[:2]
+            t, v = float(t), float(v)
+        except ValueError:
+            raise ValueError(f"Line {number}: expected 'time velocity', got {line!r}") from None
+        times.append(t)
+        velocities.append(v)
+        if len(times) >= chunk_size:
+            yield np.array(times), np.array(velocities)
+            times = []
+            velocities = []
+    if times:
+        yield np.array(times), np.array(velocities)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acceleration, jerk and rolling averages of a velocity series")
+    parser.add_argument("--window", type=int, default=5, help="samples spanned by the windowed acceleration")
+    parser.add_argument("--average", type=int, default=10, help="accelerations in the rolling mean")
+    parser.add_argument("--chunk", type=int, default=65536, help="samples per chunk")
+    args = parser.parse_args()
+
+    stream = KinematicsStream(args.window, args.average)
+    print("time,velocity,acceleration,windowed,jerk,rolling")
+    try:
+        for time, velocity in read_chunks(sys.stdin, args.chunk):
+            result = stream.push(time, velocity)
+            for row in zip(*result):
+                print(",".join(f"{value:g}" for value in row))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Nightly ages for a whole member roster.
+
+The age program works out one person's age with relativedelta. Running it
+over a large roster every night redoes every row, although only people
+whose birthday fell since the last run are a year older. This keeps a
+persisted index instead:
+
+- each person's last computed age in years
+- the people grouped by birthday, keyed by "MM-DD"
+- the day the ages were computed for
+
+A run for a new day walks the days since the last run (so skipped nights
+are caught up) and only recomputes the people whose birthday key came up.
+Feb 29 birthdays count on Feb 28 in non-leap years, the same as
+relativedelta. --verify checks every stored age against a full
+relativedelta recomputation.
+
+    python roster_age.py roster.csv --today 2026-10-19 --verify
+
+roster.csv needs the columns id, name, birth_date (YYYY-MM-DD).
+"""
+import argparse
+import calendar
+import csv
+import json
+import os
+from datetime import date, datetime, timedelta
+
+try:
+    from dateutil.relativedelta import relativedelta
+    DATEUTIL_AVAILABLE = True
+except ImportError:
+    DATEUTIL_AVAILABLE = False
+
+# A gap this long touches every birthday, so a full recompute is cheaper
+FULL_RECOMPUTE_DAYS = 366
+
+
+def age_on(birth_date, today):
+    """Age in whole years, matching relativedelta(today, birth_date).years for birth dates up to today"""
+    years = today.year - birth_date.year
+    birthday = (birth_date.month, birth_date.day)
+    if birthday == (2, 29) and not calendar.isleap(today.year):
+        birthday = (2, 28)
+    if (today.month, today.day) < birthday:
+        years -= 1
+    return years
+
+
+def day_key(day):
+    return f"{day.month:02d}-{day.day:02d}"
+
+
+def birthday_keys(day):
+    """Birthday keys whose people turn a year older on this day"""
+    keys = [day_key(day)]
+    if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+        keys.append("02-29")
+    return keys
+
+
+class AgeIndex:
+    """Last computed ages, indexed by birthday"""
+    def __init__(self, as_of=None, people=None, by_day=None):
+        self.as_of = as_of
+        self.people = people or {}  # id -> {"name", "birth_date", "age"}
+        self.by_day = by_day or {}  # "MM-DD" -> [id, ...]
+
+    # ---------- persistence ----------
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        as_of = date.fromisoformat(data["as_of"]) if data.get("as_of") else None
+        return cls(as_of, data["people"], data["by_day"])
+
+    def save(self, path):
+        data = {
+            "as_of": self.as_of.isoformat() if self.as_of else None,
+            "people": self.people,
+            "by_day": self.by_day,
+        }
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)  # Never leave a half-written index behind
+
+    # ---------- roster changes ----------
+    def _add(self, person_id, name, birth_date):
+        self.people[person_id] = {
+            "name": name,
+            "birth_date": birth_date.isoformat(),
+            "age": age_on(birth_date, self.as_of),
+        }
+        self.by_day.setdefault(day_key(birth_date), []).append(person_id)
+
+    def _remove(self, person_id):
+        person = self.people.pop(person_id)
+        key = person["birth_date"][5:]
+        self.by_day[key].remove(person_id)
+        if not self.by_day[key]:
+            del self.by_day[key]
+
+    def sync(self, roster):
+        """Bring the index in line with the roster, returns the ids that changed"""
+        changed = []
+        seen = set()
+        for person_id, name, birth_date in roster:
+            seen.add(person_id)
+            person = self.people.get(person_id)
+            if person is not None and person["birth_date"] == birth_date.isoformat():
+                person["name"] = name
+                continue
+            if person is not None:
+                self._remove(person_id)
+            self._add(person_id, name, birth_date)
+            changed.append(person_id)
+
+        for person_id in [person_id for person_id in self.people if person_id not in seen]:
+            self._remove(person_id)
+            changed.append(person_id)
+        return changed
+
+    # ---------- daily update ----------
+    def recompute_all(self, today):
+        """Recompute every age from scratch"""
+        self.as_of = today
+        for person in self.people.values():
+            person["age"] = age_on(date.fromisoformat(person["birth_date"]), today)
+        return list(self.people)
+
+    def advance(self, today):
+        """Move the index to a new day, returns the ids whose age was recomputed"""
+        if self.as_of is None or today < self.as_of or (today - self.as_of).days >= FULL_RECOMPUTE_DAYS:
+            return self.recompute_all(today)
+
+        updated = []
+        day = self.as_of
+        while day < today:
+            day += timedelta(days=1)
+            for key in birthday_keys(day):
+                for person_id in self.by_day.get(key, ()):
+                    person = self.people[person_id]
+                    person["age"] = age_on(date.fromisoformat(person["birth_date"]), today)
+                    updated.append(person_id)
+        self.as_of = today
+        return updated
+
+    def verify(self):
+        """Compare every stored age with relativedelta, returns the mismatches"""
+        if not DATEUTIL_AVAILABLE:
+            raise RuntimeError("python-dateutil is needed for --verify (pip install python-dateutil)")
+        mismatches = []
+        for person_id, person in self.people.items():
+            expected = relativedelta(self.as_of, date.fromisoformat(person["birth_date"])).years
+            if person["age"] != expected:
+                mismatches.append((person_id, person["age"], expected))
+        return mismatches
+
+
+def read_roster(path, today):
+    """Yield (id, name, birth date) rows from the roster CSV, birth dates may not be after today"""
+    # utf-8-sig also reads the byte order mark Excel puts in front of CSV exports
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            try:
+                birth_date = datetime.strptime(row["birth_date"].strip(), "%Y-%m-%d").date()
+            except ValueError:
+                raise ValueError(f"Invalid date format for {row['id']}. Please use YYYY-MM-DD.")
+            if birth_date > today:
+                raise ValueError(f"Invalid date for {row['id']}. The birth date is after {today}.")
+            yield row["id"].strip(), row["name"].strip(), birth_date
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the ages of everyone in a roster")
+    parser.add_argument("roster", help="CSV with id, name and birth_date columns")
+    parser.add_argument("--index", help="index file (default: <roster>.ages.json)")
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD")
+    parser.add_argument("--verify", action="store_true", help="check every age against relativedelta")
+    args = parser.parse_args()
+
+    index_path = args.index or os.path.splitext(args.roster)[0] + ".ages.json"
+    index = AgeIndex.load(index_path)
+
+    updated = set(index.advance(args.today))
+    try:
+        updated.update(index.sync(read_roster(args.roster, args.today)))
+    except ValueError as e:
+        print(e)
+        raise SystemExit(1)
+    index.save(index_path)
+    print(f"Ages as of {args.today}: updated {len(updated)} of {len(index.people)} people")
+
+    if args.verify:
+        mismatches = index.verify()
+        for person_id, age, expected in mismatches:
+            print(f"  {person_id}: index says {age}, relativedelta says {expected}")
+        print("Verify: OK" if not mismatches else f"Verify: {len(mismatches)} mismatches")
+        if mismatches:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Recurring alarm schedules.
+
+A schedule expression is an optional day selector followed by either a list
+of clock times or an "every" interval:
+
+    16:30                               every day at 16:30
+    weekdays 16:30                      Monday to Friday
+    weekends 09:00,13:00                two alarms on Saturday and Sunday
+    mon,wed,fri 07:15                   selected days
+    mon-thu every 45m                   every 45 minutes from midnight
+    daily every 90m from 13:00 to 17:00 nap block: 13:00, 14:30, 16:00
+
+parse_schedule() compiles an expression once into a sorted tuple of
+minute offsets and a set of weekdays. AlarmScheduler merges every loaded
+schedule into one sorted index of fire minutes per weekday, so the next
+alarm is a single bisect, O(log n) however many rules are loaded, and a
+whole day of alarms is a slice of the index.
+
+Times are local wall-clock times. A time that falls in a DST gap is moved
+forward by the length of the gap (02:30 fires at 03:30), and a time that
+happens twice on a fall-back night fires on the first pass only.
+
+    python schedules.py "weekdays 16:30" --count 5
+    python schedules.py --bench 10000
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from datetime import date, datetime, timedelta
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DAY_GROUPS = {
+    "daily": frozenset(range(7)),
+    "weekdays": frozenset(range(5)),
+    "weekends": frozenset((5, 6)),
+}
+UNITS = {"m": 1, "min": 1, "h": 60}
+
+
+# ========================= PARSING =========================
+def parse_clock(text):
+    """'16:30' -> minutes after midnight"""
+    try:
+        hours, minutes = text.split(":")
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}', use HH:MM")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time '{text}', use HH:MM")
+    return hours * 60 + minutes
+
+
+def parse_days(text):
+    """'weekdays', 'mon,wed' or 'mon-fri' -> set of weekday numbers"""
+    if text in DAY_GROUPS:
+        return DAY_GROUPS[text]
+
+    days = set()
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        if first not in WEEKDAYS or (last and last not in WEEKDAYS):
+            raise ValueError(f"Unknown day '{part}'")
+        start = WEEKDAYS.index(first)
+        end = WEEKDAYS.index(last) if last else start
+        for offset in range((end - start) % 7 + 1):
+            days.add((start + offset) % 7)
+    return frozenset(days)
+
+
+def parse_interval(text):
+    """'90m' or '2h' -> minutes"""
+    for unit in sorted(UNITS, key=len, reverse=True):
+        if text.endswith(unit) and text[:-len(unit)].isdigit():
+            minutes = int(text[:-len(unit)]) * UNITS[unit]
+            if minutes > 0:
+                return minutes
+    raise ValueError(f"Invalid interval '{text}', use e.g. 90m or 2h")
+
+
+class Schedule:
+    """A compiled schedule expression"""
+    def __init__(self, expression, days, minutes):
+        self.expression = expression
+        self.days = days
+        self.minutes = minutes  # Sorted fire times, minutes after midnight
+
+    def __repr__(self):
+        return f"Schedule({self.expression!r})"
+
+    def next_after(self, ts, calendar):
+        """First fire time strictly after timestamp ts"""
+        found = first_after(ts, calendar, lambda weekday: self.minutes if weekday in self.days else ())
+        if found is None:
+            raise ValueError(f"Schedule {self.expression!r} never fires")
+        return found[0]
+
+
+def first_after(ts, calendar, minutes_on):
+    """First fire strictly after ts within the next week.
+
+    minutes_on(weekday) gives the sorted fire minutes for that weekday.
+    Returns (timestamp, weekday, index into those minutes) or None.
+    """
+    day, minute = calendar.locate(ts)
+    for offset in range(8):
+        minutes = minutes_on(day.weekday())
+        if calendar.uniform(day):
+            index = bisect.bisect_right(minutes, minute) if offset == 0 else 0
+            if index < len(minutes):
+                return calendar.timestamp(day, minutes[index]), day.weekday(), index
+        else:
+            # On a DST change day wall-clock order and timestamp order can
+            # differ (02:30 in a gap fires after 03:00), so check every minute
+            fires = [(calendar.timestamp(day, m), day.weekday(), index) for index, m in enumerate(minutes)]
+            fires = [fire for fire in fires if fire[0] > ts]
+            if fires:
+                return min(fires)
+        day += timedelta(days=1)
+    return None
+
+
+def parse_schedule(expression):
+    """Compile a schedule expression, raises ValueError if it is invalid"""
+    words = expression.lower().split()
+    if not words:
+        raise ValueError("Empty schedule")
+
+    days = DAY_GROUPS["daily"]
+    if ":" not in words[0] and words[0] != "every":
+        days = parse_days(words.pop(0))
+
+    if words and words[0] == "every":
+        if len(words) not in (2, 6) or (len(words) == 6 and (words[2], words[4]) != ("from", "to")):
+            raise ValueError("Use 'every <interval> [from HH:MM to HH:MM]'")
+        interval = parse_interval(words[1])
+        first, last = 0, 24 * 60 - 1
+        if len(words) == 6:
+            first, last = parse_clock(words[3]), parse_clock(words[5])
+            if last < first:
+                raise ValueError("The 'to' time must be after the 'from' time")
+        minutes = range(first, last + 1, interval)
+    elif len(words) == 1:
+        minutes = [parse_clock(part) for part in words[0].split(",")]
+    else:
+        raise ValueError(f"Invalid schedule '{expression}'")
+
+    if not days:
+        raise ValueError("Schedule has no days")
+    return Schedule(expression, days, tuple(sorted(set(minutes))))
+
+
+# ========================= CALENDAR =========================
+class LocalCalendar:
+    """Converts between timestamps and local wall-clock days and minutes.
+
+    tz is a zoneinfo.ZoneInfo, or None for the operating system's local
+    time. Days without a DST change (almost all of them) are cached so
+    most conversions are plain arithmetic.
+    """
+    def __init__(self, tz=None):
+        self.tz = tz
+        self._days = {}
+        self._located = (0, -1, None)  # (start, end, date) of the last 24-hour day seen by locate()
+
+    def _wall_to_ts(self, day, minute):
+        hours, minutes = divmod(minute, 60)
+        if self.tz is None:
+            # mktime's own DST guess depends on earlier calls, so try both
+            # offsets: keep the first real match, or the later time in a gap
+            candidates = []
+            for isdst in (0, 1):
+                try:
+                    candidates.append(int(time.mktime((day.year, day.month, day.day, hours, minutes, 0, 0, 0, isdst))))
+                except (OverflowError, ValueError):
+                    pass
+            matches = [ts for ts in candidates if time.localtime(ts)[:5] == (day.year, day.month, day.day, hours, minutes)]
+            return min(matches) if matches else max(candidates)
+        wall = datetime(day.year, day.month, day.day, hours, minutes, tzinfo=self.tz)
+        return int(wall.timestamp())
+
+    def _day_start(self, day):
+        """(midnight timestamp, True if the day is exactly 24 hours long)"""
+        info = self._days.get(day)
+        if info is None:
+            start = self._wall_to_ts(day, 0)
+            end = self._wall_to_ts(day + timedelta(days=1), 0)
+            info = self._days[day] = (start, end - start == 86400)
+        return info
+
+    def uniform(self, day):
+        """True if the day has no DST change"""
+        return self._day_start(day)[1]
+
+    def timestamp(self, day, minute):
+        """Timestamp of a wall-clock minute, moved forward out of DST gaps"""
+        start, uniform = self._day_start(day)
+        if uniform:
+            return start + minute * 60
+        return self._wall_to_ts(day, minute)
+
+    def locate(self, ts):
+        """Timestamp -> (local date, minute after midnight)"""
+        start, end, day = self._located
+        if start <= ts < end:
+            return day, int(ts - start) // 60
+
+        if self.tz is None:
+            wall = time.localtime(ts)
+            day, minute = date(wall.tm_year, wall.tm_mon, wall.tm_mday), wall.tm_hour * 60 + wall.tm_min
+        else:
+            wall = datetime.fromtimestamp(ts, self.tz)
+            day, minute = wall.date(), wall.hour * 60 + wall.minute
+
+        start, uniform = self._day_start(day)
+        if uniform:
+            self._located = (start, start + 86400, day)
+        return day, minute
+
+
+# ========================= SCHEDULER =========================
+class AlarmScheduler:
+    """Every loaded schedule, merged into one sorted fire-minute index per weekday"""
+    def __init__(self, calendar=None):
+        self.calendar = calendar or LocalCalendar()
+        self._schedules = {}
+        self._handles = itertools.count()
+        self._index = None  # Per weekday: (sorted minutes, matching handles)
+
+    def __len__(self):
+        return len(self._schedules)
+
+    def add(self, schedule):
+        """Load a schedule, returns a handle for remove()"""
+        handle = next(self._handles)
+        self._schedules[handle] = schedule
+        self._index = None
+        return handle
+
+    def remove(self, handle):
+        if self._schedules.pop(handle, None) is not None:
+            self._index = None
+
+    def clear(self):
+        self._schedules = {}
+        self._index = None
+
+    def _weekdays(self):
+        """The merged index, rebuilt after schedules were added or removed"""
+        if self._index is None:
+            entries = [[] for _ in range(7)]
+            for handle, schedule in self._schedules.items():
+                for weekday in schedule.days:
+                    entries[weekday].extend((minute, handle) for minute in schedule.minutes)
+
+            self._index = []
+            for day_entries in entries:
+                day_entries.sort()
+                self._index.append((
+                    [minute for minute, _ in day_entries],
+                    [handle for _, handle in day_entries],
+                ))
+        return self._index
+
+    def next_fire(self, now):
+        """(timestamp, schedule) of the first alarm strictly after now, or None"""
+        index = self._weekdays()
+        found = first_after(now, self.calendar, lambda weekday: index[weekday][0])
+        if found is None:
+            return None
+        ts, weekday, position = found
+        return ts, self._schedules[index[weekday][1][position]]
+
+    def occurrences(self, start, end):
+        """Yield every (timestamp, schedule) in [start, end) in order"""
+        index = self._weekdays()
+        calendar = self.calendar
+        day, _ = calendar.locate(start)
+
+        while calendar.timestamp(day, 0) < end:
+            minutes, handles = index[day.weekday()]
+            if calendar.uniform(day):
+                base = calendar.timestamp(day, 0)
+                first = bisect.bisect_left(minutes, (start - base) / 60)
+                last = bisect.bisect_left(minutes, (end - base) / 60)
+                fires = [(base + minute * 60, handle)
+                         for minute, handle in zip(minutes[first:last], handles[first:last])]
+            else:
+                # A rule can land on the same instant twice when a gap
+                # moves its times forward, it still fires once
+                fires = sorted({(calendar.timestamp(day, minute), handle)
+                                for minute, handle in zip(minutes, handles)})
+                fires = [fire for fire in fires if start <= fire[0] < end]
+
+            for ts, handle in fires:
+                yield ts, self._schedules[handle]
+            day += timedelta(days=1)
+
+
+# ========================= COMMAND LINE =========================
+def random_expression():
+    """A random schedule expression, for benchmarks"""
+    days = random.choice(["daily", "weekdays", "weekends", "mon,wed,fri", "tue-sat"])
+    if random.random() < 0.3:
+        start = random.randrange(0, 20 * 60)
+        end = min(start + random.randrange(60, 300), 24 * 60 - 1)
+        return f"{days} every {random.choice([30, 45, 90])}m from {start // 60:02d}:{start % 60:02d} to {end // 60:02d}:{end % 60:02d}"
+    return f"{days} {random.randrange(24):02d}:{random.randrange(60):02d}"
+
+
+def bench(count):
+    scheduler = AlarmScheduler()
+    now = time.time()
+
+    expressions = [random_expression() for _ in range(count)]
+    started = time.perf_counter()
+    for expression in expressions:
+        scheduler.add(parse_schedule(expression))
+    scheduler.next_fire(now)
+    loaded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for offset in range(1000):
+        scheduler.next_fire(now + offset * 86.4)
+    lookup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fires = sum(1 for _ in scheduler.occurrences(now, now + 86400))
+    evaluated = time.perf_counter() - started
+
+    print(f"Compiled and loaded {count} schedules in {loaded * 1000:.1f}ms")
+    print(f"Next-alarm lookup takes {lookup * 1000:.3f}us")
+    print(f"Evaluated one day ({fires} alarms) in {evaluated * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show upcoming alarms for a schedule expression")
+    parser.add_argument("expression", nargs="?")
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--bench", type=int, metavar="N", help="time one day of N random schedules")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
+    if not args.expression:
+        parser.error("expression is required")
+
+    schedule = parse_schedule(args.expression)
+    calendar = LocalCalendar()
+    ts = time.time()
+    for _ in range(args.count):
+        ts = schedule.next_after(ts, calendar)
+        print(time.strftime("%a %Y-%m-%d %H:%M %Z", time.localtime(ts)))
+
+
+if __name__ == "__main__":
+    main()
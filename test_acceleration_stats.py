@@ -0,0 +1,104 @@
+"""Streaming statistics tests, run with: python -m pytest test_acceleration_stats.py"""
+import json
+import unittest
+
+import numpy as np
+
+from acceleration_stats import AccelerationStats, Histogram, QuantileSketch, read_inputs
+
+
+def random_inputs(rng, n):
+    v1 = rng.normal(0, 20, n)
+    v2 = rng.normal(5, 20, n)
+    time = rng.uniform(0.5, 10, n)
+    time[::97] = 0  # Some results are not finite
+    return v1, v2, time
+
+
+class MergeTest(unittest.TestCase):
+    def assert_same_stats(self, merged, single):
+        self.assertEqual(merged.moments.count, single.moments.count)
+        self.assertEqual(merged.moments.min, single.moments.min)
+        self.assertEqual(merged.moments.max, single.moments.max)
+        self.assertAlmostEqual(merged.moments.mean, single.moments.mean)
+        self.assertAlmostEqual(merged.moments.variance(), single.moments.variance())
+
+        self.assertEqual(merged.sketch.positive, single.sketch.positive)
+        self.assertEqual(merged.sketch.negative, single.sketch.negative)
+        self.assertEqual(merged.sketch.zeros, single.sketch.zeros)
+        self.assertEqual(merged.sketch.count, single.sketch.count)
+
+        self.assertTrue(np.array_equal(merged.histogram.counts, single.histogram.counts))
+        self.assertEqual(merged.histogram.underflow, single.histogram.underflow)
+        self.assertEqual(merged.histogram.overflow, single.histogram.overflow)
+        self.assertEqual(merged.invalid, single.invalid)
+
+    def test_split_and_merge_matches_single_pass(self):
+        rng = np.random.default_rng(35)
+        v1, v2, time = random_inputs(rng, 20000)
+        single = AccelerationStats()
+        single.add_inputs(v1, v2, time)
+
+        cuts = np.sort(rng.choice(np.arange(1, len(time)), size=7, replace=False))
+        merged = AccelerationStats()
+        for part in zip(np.split(v1, cuts), np.split(v2, cuts), np.split(time, cuts)):
+            stats = AccelerationStats()
+            stats.add_inputs(*part)
+            merged.merge(stats)
+
+        self.assertGreater(single.invalid, 0)
+        self.assert_same_stats(merged, single)
+
+    def test_saved_parts_merge(self):
+        rng = np.random.default_rng(7)
+        v1, v2, time = random_inputs(rng, 5000)
+        single = AccelerationStats()
+        single.add_inputs(v1, v2, time)
+
+        merged = None
+        for part in zip(np.array_split(v1, 3), np.array_split(v2, 3), np.array_split(time, 3)):
+            stats = AccelerationStats()
+            stats.add_inputs(*part)
+            stats = AccelerationStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+            if merged is None:
+                merged = stats
+            else:
+                merged.merge(stats)
+        self.assert_same_stats(merged, single)
+
+    def test_mismatched_histograms(self):
+        with self.assertRaises(ValueError):
+            Histogram(-20, 20, 40).merge(Histogram(-10, 10, 40))
+
+
+class QuantileTest(unittest.TestCase):
+    def test_relative_accuracy(self):
+        rng = np.random.default_rng(99)
+        values = np.concatenate((rng.lognormal(0, 2, 30000), -rng.lognormal(1, 1, 10000), np.zeros(500)))
+        sketch = QuantileSketch(0.01)
+        for chunk in np.array_split(rng.permutation(values), 10):
+            sketch.add(chunk)
+
+        for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999):
+            expected = np.quantile(values, q, method="lower")
+            got = sketch.quantile(q)
+            self.assertLessEqual(abs(got - expected), abs(expected) * sketch.relative_accuracy + 1e-12, q)
+
+    def test_empty(self):
+        self.assertTrue(np.isnan(QuantileSketch().quantile(0.5)))
+
+
+class ReadInputsTest(unittest.TestCase):
+    def test_chunks(self):
+        chunks = list(read_inputs(["1 2 3", "# comment", "", "4,5,6", "7 8 9 10"], chunk_size=2))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0].tolist(), [[1, 4], [2, 5], [3, 6]])
+        self.assertEqual(chunks[1].tolist(), [[7], [8], [9]])
+
+    def test_short_row(self):
+        with self.assertRaisesRegex(ValueError, "Line 2: expected 'V1 V2 Time'"):
+            list(read_inputs(["1 2 3", "4 5"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
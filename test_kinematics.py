@@ -0,0 +1,54 @@
+"""KinematicsStream tests, run with: python -m pytest test_kinematics.py"""
+import unittest
+
+import numpy as np
+
+from kinematics import KinematicsStream, compute, read_chunks
+
+
+def random_series(rng, n):
+    time = np.cumsum(rng.uniform(0.01, 1.0, n))
+    velocity = rng.normal(0, 10, n)
+    return time, velocity
+
+
+class KinematicsStreamTest(unittest.TestCase):
+    def assert_same(self, got, expected):
+        for field in expected._fields:
+            self.assertTrue(np.array_equal(getattr(got, field), getattr(expected, field), equal_nan=True), field)
+
+    def test_random_splits_match_whole_array(self):
+        rng = np.random.default_rng(29)
+        for window, average in [(1, 1), (5, 10), (12, 3)]:
+            time, velocity = random_series(rng, 2000)
+            expected = compute(time, velocity, window, average)
+            for _ in range(10):
+                cuts = np.sort(rng.choice(np.arange(1, len(time)), size=rng.integers(1, 50), replace=False))
+                stream = KinematicsStream(window, average)
+                parts = [stream.push(t, v) for t, v in zip(np.split(time, cuts), np.split(velocity, cuts))]
+                got = type(expected)(*(np.concatenate([getattr(part, field) for part in parts])
+                                       for field in expected._fields))
+                self.assert_same(got, expected)
+
+    def test_single_sample_chunks(self):
+        rng = np.random.default_rng(1)
+        time, velocity = random_series(rng, 50)
+        expected = compute(time, velocity)
+        stream = KinematicsStream()
+        parts = [stream.push(time[i:i + 1], velocity[i:i + 1]) for i in range(len(time))]
+        got = type(expected)(*(np.concatenate([getattr(part, field) for part in parts]) for field in expected._fields))
+        self.assert_same(got, expected)
+
+    def test_timestamps_must_increase_across_chunks(self):
+        stream = KinematicsStream()
+        stream.push([0.0, 1.0, 2.0], [0.0, 1.0, 2.0])
+        with self.assertRaises(ValueError):
+            stream.push([2.0, 3.0], [3.0, 4.0])
+
+    def test_read_chunks_reports_line(self):
+        with self.assertRaisesRegex(ValueError, "Line 3"):
+            list(read_chunks(["0 1", "# comment", "2"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
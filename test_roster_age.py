@@ -0,0 +1,120 @@
+"""AgeIndex tests, run with: python -m pytest test_roster_age.py"""
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from roster_age import DATEUTIL_AVAILABLE, AgeIndex, age_on, read_roster
+
+needs_dateutil = unittest.skipUnless(DATEUTIL_AVAILABLE, "verify() needs python-dateutil")
+
+ROSTER = [
+    ("leap", "Leap Day", date(2000, 2, 29)),
+    ("eve", "Feb 28", date(2001, 2, 28)),
+    ("march", "Mar 1", date(2003, 3, 1)),
+    ("new_year", "Jan 1", date(1999, 1, 1)),
+    ("dec", "Dec 31", date(1990, 12, 31)),
+    ("baby", "Baby", date(2020, 6, 15)),
+]
+
+
+class AgeOnTest(unittest.TestCase):
+    def test_leap_day_birthday(self):
+        born = date(2000, 2, 29)
+        self.assertEqual(age_on(born, date(2023, 2, 27)), 22)
+        self.assertEqual(age_on(born, date(2023, 2, 28)), 23)
+        self.assertEqual(age_on(born, date(2024, 2, 28)), 23)
+        self.assertEqual(age_on(born, date(2024, 2, 29)), 24)
+
+
+class AgeIndexTest(unittest.TestCase):
+    @needs_dateutil
+    def test_advance_with_skipped_nights(self):
+        index = AgeIndex()
+        today = date(2021, 1, 1)
+        index.advance(today)
+        index.sync(ROSTER)
+
+        rng = random.Random(34)
+        end = date(2026, 12, 31)  # Crosses the 2024 leap year
+        while today < end:
+            today += timedelta(days=rng.choice([1, 1, 1, 2, 3, 7, 40]))
+            index.advance(today)
+            self.assertEqual(index.verify(), [], today)
+
+    @needs_dateutil
+    def test_advance_only_recomputes_birthdays(self):
+        index = AgeIndex()
+        index.advance(date(2023, 2, 27))
+        index.sync(ROSTER)
+        # 2023 is not a leap year, so Feb 29 birthdays count on Feb 28
+        self.assertEqual(sorted(index.advance(date(2023, 2, 28))), ["eve", "leap"])
+        self.assertEqual(index.advance(date(2023, 3, 1)), ["march"])
+        self.assertEqual(index.advance(date(2023, 3, 1)), [])
+
+        index.advance(date(2024, 2, 27))
+        self.assertEqual(index.advance(date(2024, 2, 28)), ["eve"])
+        self.assertEqual(index.advance(date(2024, 2, 29)), ["leap"])
+        self.assertEqual(index.verify(), [])
+
+    @needs_dateutil
+    def test_sync_added_removed_and_changed(self):
+        index = AgeIndex()
+        index.advance(date(2026, 10, 19))
+        self.assertEqual(sorted(index.sync(ROSTER[:3])), ["eve", "leap", "march"])
+
+        roster = [
+            ("leap", "Leap Day", date(2000, 2, 29)),  # Unchanged
+            ("eve", "Renamed", date(2001, 2, 28)),  # Name change only
+            ("march", "Mar 1", date(2003, 10, 20)),  # New birth date
+            ("new", "New", date(2010, 5, 5)),  # Added
+        ]
+        self.assertEqual(sorted(index.sync(roster)), ["march", "new"])
+        self.assertEqual(index.people["eve"]["name"], "Renamed")
+        self.assertNotIn("03-01", index.by_day)
+        self.assertEqual(index.by_day["10-20"], ["march"])
+
+        self.assertEqual(sorted(index.sync(roster[1:])), ["leap"])
+        self.assertNotIn("leap", index.people)
+        self.assertNotIn("02-29", index.by_day)
+
+        # The moved birthday is picked up by the next day's run
+        self.assertEqual(index.advance(date(2026, 10, 20)), ["march"])
+        self.assertEqual(index.people["march"]["age"], 23)
+        self.assertEqual(index.verify(), [])
+
+    def test_save_and_load(self):
+        index = AgeIndex()
+        index.advance(date(2026, 10, 19))
+        index.sync(ROSTER)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "ages.json")
+            index.save(path)
+            loaded = AgeIndex.load(path)
+        self.assertEqual(loaded.as_of, index.as_of)
+        self.assertEqual(loaded.people, index.people)
+        self.assertEqual(loaded.by_day, index.by_day)
+
+
+class ReadRosterTest(unittest.TestCase):
+    def read(self, text, today=date(2026, 10, 19)):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "roster.csv")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            return list(read_roster(path, today))
+
+    def test_byte_order_mark(self):
+        rows = self.read("\ufeffid,name,birth_date\n1, Ann ,2000-12-01\n")
+        self.assertEqual(rows, [("1", "Ann", date(2000, 12, 1))])
+
+    def test_invalid_dates(self):
+        with self.assertRaisesRegex(ValueError, "Invalid date format for 1"):
+            self.read("id,name,birth_date\n1,Ann,2000-13-01\n")
+        with self.assertRaisesRegex(ValueError, "Invalid date for 1"):
+            self.read("id,name,birth_date\n1,Ann,2026-12-01\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
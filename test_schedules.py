@@ -0,0 +1,98 @@
+"""Schedule parsing and AlarmScheduler tests, run with: python -m pytest test_schedules.py"""
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from schedules import AlarmScheduler, LocalCalendar, parse_schedule
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def ts(*wall):
+    """Timestamp of a New York wall-clock time (first pass if it happens twice)"""
+    return int(datetime(*wall, tzinfo=NEW_YORK).timestamp())
+
+
+def wall(timestamp):
+    return datetime.fromtimestamp(timestamp, NEW_YORK).strftime("%Y-%m-%d %H:%M %Z")
+
+
+class ParseTest(unittest.TestCase):
+    def test_times_and_days(self):
+        schedule = parse_schedule("weekends 13:00,09:00")
+        self.assertEqual(schedule.days, {5, 6})
+        self.assertEqual(schedule.minutes, (9 * 60, 13 * 60))
+
+        self.assertEqual(parse_schedule("16:30").days, set(range(7)))
+        self.assertEqual(parse_schedule("weekdays 16:30").days, set(range(5)))
+        self.assertEqual(parse_schedule("mon,wed,fri 07:15").days, {0, 2, 4})
+        self.assertEqual(parse_schedule("fri-mon 07:15").days, {4, 5, 6, 0})
+
+    def test_every_expansion(self):
+        schedule = parse_schedule("daily every 90m from 13:00 to 17:00")
+        self.assertEqual(schedule.minutes, (13 * 60, 14 * 60 + 30, 16 * 60))
+        self.assertEqual(len(parse_schedule("mon-thu every 45m").minutes), 32)
+        self.assertEqual(parse_schedule("every 2h").minutes, tuple(range(0, 24 * 60, 120)))
+
+    def test_errors(self):
+        for expression in ["", "25:00", "16:60", "noon", "someday 16:30", "every 0m", "every 5x",
+                           "every 90m from 17:00 to 13:00", "every 90m from 13:00", "16:30 17:30"]:
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                parse_schedule(expression)
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = AlarmScheduler(LocalCalendar(NEW_YORK))
+
+    def fires(self, start, end):
+        return [wall(fire) for fire, schedule in self.scheduler.occurrences(start, end)]
+
+    def test_next_fire_is_strictly_after_now(self):
+        schedule = parse_schedule("weekdays 16:30")
+        self.scheduler.add(schedule)
+        monday = ts(2026, 10, 19, 16, 30)
+        self.assertEqual(self.scheduler.next_fire(monday - 1), (monday, schedule))
+        self.assertEqual(self.scheduler.next_fire(monday)[0], ts(2026, 10, 20, 16, 30))
+        # Friday's alarm is followed by Monday's
+        self.assertEqual(self.scheduler.next_fire(ts(2026, 10, 23, 16, 30))[0], ts(2026, 10, 26, 16, 30))
+
+    def test_next_fire_picks_the_earliest_schedule(self):
+        late = parse_schedule("daily 09:00")
+        early = parse_schedule("daily 08:00")
+        self.scheduler.add(late)
+        self.scheduler.add(early)
+        self.assertEqual(self.scheduler.next_fire(ts(2026, 10, 19, 7, 0)), (ts(2026, 10, 19, 8, 0), early))
+        self.assertIsNone(AlarmScheduler(LocalCalendar(NEW_YORK)).next_fire(0))
+
+    def test_occurrences_are_half_open(self):
+        self.scheduler.add(parse_schedule("daily 08:00,20:00"))
+        start, end = ts(2026, 10, 19, 8, 0), ts(2026, 10, 20, 8, 0)
+        self.assertEqual(self.fires(start, end), ["2026-10-19 08:00 EDT", "2026-10-19 20:00 EDT"])
+        self.assertEqual(self.fires(start + 1, end + 1), ["2026-10-19 20:00 EDT", "2026-10-20 08:00 EDT"])
+
+    def test_spring_forward_gap_moves_forward(self):
+        self.scheduler.add(parse_schedule("daily 01:30,02:30,03:30"))
+        # On 2026-03-08 clocks jump from 02:00 to 03:00, so 02:30 fires at 03:30
+        fires = self.fires(ts(2026, 3, 8), ts(2026, 3, 9))
+        self.assertEqual(fires, ["2026-03-08 01:30 EST", "2026-03-08 03:30 EDT"])
+        self.assertEqual(wall(self.scheduler.next_fire(ts(2026, 3, 8, 1, 30))[0]), "2026-03-08 03:30 EDT")
+
+    def test_fall_back_repeat_fires_once(self):
+        self.scheduler.add(parse_schedule("daily 00:30,01:30,02:30"))
+        # On 2026-11-01 01:00-02:00 happens twice, 01:30 fires on the first pass
+        fires = self.fires(ts(2026, 11, 1), ts(2026, 11, 2))
+        self.assertEqual(fires, ["2026-11-01 00:30 EDT", "2026-11-01 01:30 EDT", "2026-11-01 02:30 EST"])
+
+        first_pass = ts(2026, 11, 1, 1, 30)
+        self.assertEqual(wall(self.scheduler.next_fire(first_pass)[0]), "2026-11-01 02:30 EST")
+        self.assertEqual(self.scheduler.next_fire(first_pass + 1800)[0], ts(2026, 11, 1, 2, 30))
+
+    def test_every_across_a_dst_change(self):
+        self.scheduler.add(parse_schedule("sun every 1h"))
+        self.assertEqual(len(self.fires(ts(2026, 3, 8), ts(2026, 3, 9))), 23)
+        self.assertEqual(len(self.fires(ts(2026, 11, 1), ts(2026, 11, 2))), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
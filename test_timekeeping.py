@@ -0,0 +1,139 @@
+"""Countdown and VirtualClock tests, run with: python -m pytest test_timekeeping.py"""
+import unittest
+
+from timekeeping import VirtualClock, Countdown, timer_color, replay
+
+
+class VirtualClockTest(unittest.TestCase):
+    def test_same_deadline_fires_in_schedule_order(self):
+        clock = VirtualClock()
+        fired = []
+        for name in "abcde":
+            clock.after(5, fired.append, name)
+        clock.after(1, fired.append, "first")
+        clock.run()
+        self.assertEqual(fired, ["first", "a", "b", "c", "d", "e"])
+        self.assertEqual(clock.time(), 5)
+
+    def test_sleep_fires_callbacks_on_the_way(self):
+        clock = VirtualClock()
+        fired = []
+        clock.after(2, lambda: fired.append(clock.time()))
+        clock.sleep(3)
+        self.assertEqual(fired, [2])
+        self.assertEqual(clock.time(), 3)
+
+    def test_cancel(self):
+        clock = VirtualClock()
+        fired = []
+        handle = clock.after(1, fired.append, "cancelled")
+        clock.after(2, fired.append, "kept")
+        clock.cancel(handle)
+        self.assertEqual(clock.pending(), 1)
+        clock.run()
+        self.assertEqual(fired, ["kept"])
+        self.assertEqual(clock.pending(), 0)
+
+    def test_cancel_after_fire_and_twice(self):
+        clock = VirtualClock()
+        fired_handle = clock.after(1, lambda: None)
+        clock.advance(1)
+        clock.cancel(fired_handle)
+        self.assertEqual(clock.pending(), 0)
+
+        handle = clock.after(1, lambda: None)
+        clock.cancel(handle)
+        clock.cancel(handle)
+        self.assertEqual(clock.pending(), 0)
+        clock.after(1, lambda: None)
+        self.assertEqual(clock.pending(), 1)
+
+
+class CountdownTest(unittest.TestCase):
+    def test_timer_color(self):
+        self.assertEqual(timer_color(31), "#0ea5e9")
+        self.assertEqual(timer_color(30), "#f59e0b")
+        self.assertEqual(timer_color(11), "#f59e0b")
+        self.assertEqual(timer_color(10), "#ef4444")
+        self.assertEqual(timer_color(0), "#ef4444")
+
+    def test_color_changes(self):
+        events = replay(1)
+        colors = [(at, value) for at, kind, value in events if kind == "color"]
+        self.assertEqual(colors, [(0, "#0ea5e9"), (30, "#f59e0b"), (50, "#ef4444")])
+
+    def test_alarm_time(self):
+        clock = VirtualClock()
+        ticks = []
+        countdown = Countdown(600, clock, on_tick=ticks.append)
+        self.assertTrue(countdown.run())
+        self.assertEqual(clock.time(), 601)
+        self.assertEqual(ticks, list(range(600, -1, -1)))
+
+    def test_pauses_delay_the_alarm(self):
+        events = replay(10, [(120, 30), (400, 90)])
+        kinds = [(round(at, 6), kind) for at, kind, value in events if kind != "color"]
+        self.assertEqual(kinds, [(120, "pause"), (150, "resume"), (400, "pause"), (490, "resume"), (721, "alarm")])
+
+    def test_paused_countdown_does_not_tick(self):
+        clock = VirtualClock()
+        ticks = []
+        countdown = Countdown(10, clock, on_tick=lambda seconds: ticks.append((clock.time(), seconds)))
+        clock.after(3, countdown.pause)
+        clock.after(63, countdown.resume)
+        self.assertTrue(countdown.run())
+        self.assertFalse([seconds for at, seconds in ticks if 3 < at < 63])
+        self.assertEqual([seconds for at, seconds in ticks], list(range(10, -1, -1)))
+
+    def test_slow_ticks_do_not_delay_the_alarm(self):
+        clock = VirtualClock()
+        countdown = Countdown(600, clock, on_tick=lambda seconds: clock.sleep(0.3))
+        self.assertTrue(countdown.run())
+        self.assertAlmostEqual(clock.time(), 601)
+
+    def test_fixed_deadline(self):
+        clock = VirtualClock(1000.25)
+        ticks = []
+        countdown = Countdown(None, clock, on_tick=ticks.append, deadline=1100)
+        self.assertTrue(countdown.run())
+        self.assertEqual(clock.time(), 1100)
+        self.assertEqual(ticks, list(range(99, -1, -1)))
+
+    def test_fixed_deadline_after_suspend(self):
+        class SuspendingClock(VirtualClock):
+            def sleep(self, seconds):
+                if self.time() == 10:
+                    seconds += 3 * 3600  # The machine sleeps for three hours
+                super().sleep(seconds)
+
+        clock = SuspendingClock()
+        countdown = Countdown(None, clock, deadline=7200)
+        self.assertTrue(countdown.run())
+        self.assertEqual(clock.time(), 11 + 3 * 3600)
+
+    def test_pause_keeps_a_fixed_deadline(self):
+        clock = VirtualClock()
+        countdown = Countdown(None, clock, deadline=100)
+        clock.after(20, countdown.pause)
+        clock.after(50, countdown.resume)
+        self.assertTrue(countdown.run())
+        self.assertEqual(clock.time(), 100)
+
+    def test_fixed_alarm_due_during_pause_fires_on_resume(self):
+        clock = VirtualClock()
+        countdown = Countdown(None, clock, deadline=100)
+        clock.after(80, countdown.pause)
+        clock.after(130, countdown.resume)
+        self.assertTrue(countdown.run())
+        self.assertAlmostEqual(clock.time(), 130, delta=0.1)  # Pauses are polled every 0.1s
+
+    def test_stop(self):
+        clock = VirtualClock()
+        countdown = Countdown(600, clock)
+        clock.after(5, countdown.stop)
+        self.assertFalse(countdown.run())
+        self.assertEqual(clock.time(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+"""Clock sources for the alarm app.
+
+Everything that waits or reads the time (the countdown, the frame loop and
+the alarm sound loops) goes through one of these clocks instead of calling
+time.sleep / time.time directly:
+
+- SystemClock: real time, callbacks on background timers
+- TkClock: real time, callbacks on the Tk event loop (safe for widgets)
+- VirtualClock: simulated time that jumps forward instantly, so a
+  10-minute alarm with pauses finishes in milliseconds
+
+Run this file directly to replay a countdown on the virtual clock:
+
+    python timekeeping.py 10 --pause 120:30 --pause 400:90
+"""
+import argparse
+import heapq
+import itertools
+import math
+import threading
+import time
+
+
+# ========================= CLOCKS =========================
+class SystemClock:
+    """Real wall-clock time"""
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.perf_counter()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def after(self, seconds, callback, *args):
+        """Call callback(*args) after the given delay, returns a handle for cancel()"""
+        timer = threading.Timer(seconds, callback, args)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def cancel(self, handle):
+        handle.cancel()
+
+
+class TkClock(SystemClock):
+    """Real time with callbacks scheduled on the Tk event loop"""
+    def __init__(self, root):
+        self.root = root
+
+    def after(self, seconds, callback, *args):
+        return self.root.after(int(seconds * 1000), callback, *args)
+
+    def cancel(self, handle):
+        self.root.after_cancel(handle)
+
+
+class VirtualClock:
+    """Simulated time that only moves when someone sleeps or advances it.
+
+    Callbacks fire in deadline order, and callbacks with the same deadline
+    fire in the order they were scheduled, so every run is deterministic.
+    Drive it from a single thread for reproducible results.
+    """
+    def __init__(self, start=0.0):
+        self._now = float(start)
+        self._queue = []
+        self._seq = itertools.count()
+        self._queued = set()  # Handles that are still waiting to fire
+        self._lock = threading.RLock()
+
+    def time(self):
+        return self._now
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def after(self, seconds, callback, *args):
+        with self._lock:
+            handle = next(self._seq)
+            deadline = self._now + max(seconds, 0)
+            heapq.heappush(self._queue, (deadline, handle, callback, args))
+            self._queued.add(handle)
+        return handle
+
+    def cancel(self, handle):
+        """Drop a queued callback, handles that already fired are ignored"""
+        with self._lock:
+            self._queued.discard(handle)
+
+    def pending(self):
+        """Number of callbacks still waiting to fire"""
+        with self._lock:
+            return len(self._queued)
+
+    def advance(self, seconds):
+        """Move time forward, firing every callback that falls due on the way"""
+        self.run_until(self._now + seconds)
+
+    def run_until(self, deadline):
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > deadline:
+                    self._now = max(self._now, deadline)
+                    return
+                when, handle, callback, args = heapq.heappop(self._queue)
+                self._now = max(self._now, when)
+                if handle not in self._queued:
+                    continue  # Cancelled
+                self._queued.discard(handle)
+            callback(*args)
+
+    def run(self, limit=None):
+        """Fire callbacks until none are left (or until time reaches limit)"""
+        while True:
+            with self._lock:
+                if not self._queue:
+                    return
+                deadline = self._queue[0][0]
+            if limit is not None and deadline > limit:
+                self.run_until(limit)
+                return
+            self.run_until(deadline)
+
+
+# ========================= COUNTDOWN =========================
+def timer_color(remaining_seconds):
+    """Timer colour for the seconds left"""
+    if remaining_seconds <= 10:
+        return "#ef4444"  # Red
+    elif remaining_seconds <= 30:
+        return "#f59e0b"  # Orange
+    return "#0ea5e9"  # Blue
+
+
+class Countdown:
+    """The alarm countdown, ticking once per second on the given clock.
+
+    The alarm fires at an absolute deadline on clock.time(), and every tick
+    works the seconds left out from it again, so slow ticks or a suspended
+    machine never push the alarm back. remaining_seconds is what the timer
+    shows; it reads 0 during the last second.
+
+    Pass deadline for an alarm at a fixed time, such as the next time of a
+    schedule. Pausing a plain countdown stops it, so the deadline moves on
+    by the length of the pause. Pausing a fixed alarm only holds it: the
+    deadline stays put, and if it passes during the pause the alarm fires
+    as soon as it is resumed.
+    """
+    def __init__(self, total_seconds, clock, on_tick=None, stop_event=None, deadline=None):
+        self.clock = clock
+        self.fixed = deadline is not None
+        if deadline is None:
+            deadline = clock.time() + total_seconds + 1
+        elif total_seconds is None:
+            total_seconds = deadline - clock.time()
+        self.deadline = deadline
+        self.total_seconds = total_seconds
+        self.remaining_seconds = max(0, math.ceil(deadline - clock.time()) - 1)
+        self.on_tick = on_tick
+        self.stop_event = stop_event or threading.Event()
+        self.paused = False
+        self._left = None  # Seconds to the deadline when paused
+
+    def progress(self):
+        """Elapsed share of the countdown in percent"""
+        if self.total_seconds <= 0:
+            return 100
+        done = self.total_seconds - self.remaining_seconds
+        return min(done / self.total_seconds * 100, 100)
+
+    def pause(self):
+        if not self.paused:
+            self._left = self.deadline - self.clock.time()
+            self.paused = True
+
+    def resume(self):
+        if self.paused:
+            if not self.fixed:
+                self.deadline = self.clock.time() + self._left
+            self.paused = False
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        """Count down to the deadline, returns True if the alarm should fire"""
+        while not self.stop_event.is_set():
+            if self.paused:
+                self.clock.sleep(0.1)  # Check pause state frequently
+                continue
+
+            left = self.deadline - self.clock.time()
+            if left <= 0:
+                break
+            self.remaining_seconds = math.ceil(left) - 1
+            if self.on_tick:
+                self.on_tick(self.remaining_seconds)
+            # Wake at the next whole second before the deadline, however long on_tick took
+            left = self.deadline - self.clock.time()
+            self.clock.sleep(max(0, left - self.remaining_seconds))
+
+        return not self.stop_event.is_set()
+
+
+# ========================= REPLAY =========================
+def replay(minutes, pauses=()):
+    """Run a countdown on a virtual clock, returns the events it produced.
+
+    pauses is a list of (at_seconds, length_seconds) pairs.
+    """
+    clock = VirtualClock()
+    events = []
+    last_color = [None]
+
+    def on_tick(seconds):
+        color = timer_color(seconds)
+        if color != last_color[0]:
+            last_color[0] = color
+            events.append((clock.time(), "color", color))
+
+    countdown = Countdown(int(minutes * 60), clock, on_tick=on_tick)
+
+    def pause(length):
+        countdown.pause()
+        events.append((clock.time(), "pause", length))
+        clock.after(length, resume)
+
+    def resume():
+        countdown.resume()
+        events.append((clock.time(), "resume", None))
+
+    for at, length in pauses:
+        clock.after(at, pause, length)
+
+    if countdown.run():
+        events.append((clock.time(), "alarm", None))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast-forward an alarm countdown")
+    parser.add_argument("minutes", type=float)
+    parser.add_argument("--pause", action="append", default=[],
+                        metavar="AT:LENGTH", help="pause at AT seconds for LENGTH seconds")
+    args = parser.parse_args()
+
+    pauses = []
+    for item in args.pause:
+        at, length = item.split(":")
+        pauses.append((float(at), float(length)))
+
+    started = time.perf_counter()
+    events = replay(args.minutes, pauses)
+    elapsed = time.perf_counter() - started
+
+    for at, kind, value in events:
+        mins, secs = divmod(int(at), 60)
+        print(f"{mins:02d}:{secs:02d}  {kind:<6} {value if value is not None else ''}")
+    print(f"\nSimulated {events[-1][0]:.1f}s in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()